@@ -2,7 +2,7 @@
 
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User, OwnerProfile, Residence, ResidencePhoto, Booking
+from .models import User, OwnerProfile, Residence, ResidencePhoto, Booking, ArchivedBooking, OutboxEvent, PricingRule
 
 # This allows us to edit the OwnerProfile directly from the User admin page
 class OwnerProfileInline(admin.StackedInline):
@@ -35,19 +35,41 @@ class ResidencePhotoInline(admin.TabularInline):
     model = ResidencePhoto
     extra = 1  # Show one extra blank photo form by default
 
+class PricingRuleInline(admin.TabularInline):
+    model = PricingRule
+    extra = 0
+
 class ResidenceAdmin(admin.ModelAdmin):
-    inlines = [ResidencePhotoInline]
+    inlines = [ResidencePhotoInline, PricingRuleInline]
     list_display = ('title', 'owner', 'city', 'price_per_night', 'is_available')
     list_filter = ('is_available', 'city', 'country')
     search_fields = ('title', 'description', 'owner__email')
 
 class BookingAdmin(admin.ModelAdmin):
-    list_display = ('residence', 'guest', 'check_in_date', 'check_out_date', 'status')
+    list_display = ('residence', 'guest', 'check_in_date', 'check_out_date', 'status', 'total_price')
+    list_filter = ('status', 'check_in_date')
+    search_fields = ('residence__title', 'guest__email')
+
+class ArchivedBookingAdmin(admin.ModelAdmin):
+    list_display = ('residence', 'guest', 'check_in_date', 'check_out_date', 'status', 'total_price', 'archived_at')
     list_filter = ('status', 'check_in_date')
     search_fields = ('residence__title', 'guest__email')
 
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ('event_type', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at')
+    list_filter = ('status', 'event_type')
+    readonly_fields = ('event_type', 'payload', 'attempts', 'last_error', 'delivered', 'created_at', 'sent_at')
+
 
 # Register our models with their custom admin options
 admin.site.register(User, UserAdmin)
 admin.site.register(Residence, ResidenceAdmin)
-admin.site.register(Booking, BookingAdmin)
\ No newline at end of file
+admin.site.register(Booking, BookingAdmin)
+admin.site.register(ArchivedBooking, ArchivedBookingAdmin)
+admin.site.register(OutboxEvent, OutboxEventAdmin)
\ No newline at end of file
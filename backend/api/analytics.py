@@ -0,0 +1,134 @@
+# backend/api/analytics.py
+
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from itertools import chain
+
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import (
+    Booking, ArchivedBooking, OwnerProfile, DailyBookingStats, DailyOwnerSignupStats, RollupState,
+)
+
+ROLLUP_NAME = 'analytics'
+# Rows committed by transactions that started before the previous run may carry
+# an older updated_at, so each run looks a little further back than its watermark.
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+
+def day_bounds(day):
+    start = timezone.make_aware(datetime.combine(day, time.min), timezone.get_current_timezone())
+    return start, start + timedelta(days=1)
+
+
+def changed_booking_days(since):
+    if since is None:
+        # Archived bookings never change, but a full rebuild must still count them
+        days = set(ArchivedBooking.objects.annotate(day=TruncDate('created_at')).values_list('day', flat=True).distinct())
+        queryset = Booking.objects.all()
+    else:
+        days = set()
+        queryset = Booking.objects.filter(updated_at__gte=since)
+    return days | set(queryset.annotate(day=TruncDate('created_at')).values_list('day', flat=True).distinct())
+
+
+def changed_signup_days(since):
+    queryset = OwnerProfile.objects.all() if since is None else OwnerProfile.objects.filter(updated_at__gte=since)
+    return set(queryset.annotate(day=TruncDate('user__date_joined')).values_list('day', flat=True).distinct())
+
+
+def rebuild_booking_day(day):
+    """
+    Recomputes the DailyBookingStats rows of one day from that day's bookings
+    only, live and archived.
+    """
+    start, end = day_bounds(day)
+    fields = (
+        'status', 'check_in_date', 'check_out_date', 'total_price',
+        'residence__city', 'residence__owner_id', 'residence__price_per_night',
+    )
+    bookings = chain(
+        Booking.objects.filter(created_at__gte=start, created_at__lt=end).values(*fields),
+        ArchivedBooking.objects.filter(created_at__gte=start, created_at__lt=end).values(*fields),
+    )
+
+    rows = defaultdict(lambda: {
+        'bookings_created': 0, 'bookings_confirmed': 0, 'bookings_cancelled': 0,
+        'occupied_nights': 0, 'gross_booking_value': Decimal('0'),
+    })
+    for booking in bookings:
+        row = rows[(booking['residence__city'], booking['residence__owner_id'])]
+        row['bookings_created'] += 1
+        if booking['status'] == 'cancelled':
+            row['bookings_cancelled'] += 1
+        elif booking['status'] == 'confirmed':
+            nights = (booking['check_out_date'] - booking['check_in_date']).days
+            row['bookings_confirmed'] += 1
+            row['occupied_nights'] += nights
+            # Bookings made before quotes were stored have no total_price
+            row['gross_booking_value'] += (
+                booking['total_price'] if booking['total_price'] is not None
+                else booking['residence__price_per_night'] * nights
+            )
+
+    DailyBookingStats.objects.filter(date=day).delete()
+    DailyBookingStats.objects.bulk_create(
+        DailyBookingStats(date=day, city=city, owner_id=owner_id, **values)
+        for (city, owner_id), values in rows.items()
+    )
+
+
+def rebuild_signup_day(day):
+    """
+    Recomputes the DailyOwnerSignupStats rows of one day.
+    """
+    start, end = day_bounds(day)
+    counts = (
+        OwnerProfile.objects
+        .filter(user__date_joined__gte=start, user__date_joined__lt=end)
+        .values('account_status')
+        .annotate(new_owners=Count('pk'))
+    )
+
+    DailyOwnerSignupStats.objects.filter(date=day).delete()
+    DailyOwnerSignupStats.objects.bulk_create(
+        DailyOwnerSignupStats(date=day, account_status=row['account_status'], new_owners=row['new_owners'])
+        for row in counts
+    )
+
+
+def update_rollups(full=False):
+    """
+    Rebuilds the rollups of every day that had a booking or owner profile change
+    since the last run (every day when `full` is set). Returns the number of
+    (booking days, sign-up days) processed.
+
+    Deleted rows don't leave a trace, so run with `full` occasionally to catch them.
+    """
+    started = timezone.now()
+    RollupState.objects.get_or_create(name=ROLLUP_NAME)
+
+    with transaction.atomic():
+        # Locking the state row makes concurrent runs (e.g. on several nodes) wait for each other
+        state = RollupState.objects.select_for_update().get(name=ROLLUP_NAME)
+        since = None if full or state.last_run_at is None else state.last_run_at - WATERMARK_OVERLAP
+
+        if full:
+            DailyBookingStats.objects.all().delete()
+            DailyOwnerSignupStats.objects.all().delete()
+
+        booking_days = sorted(changed_booking_days(since))
+        signup_days = sorted(changed_signup_days(since))
+        for day in booking_days:
+            rebuild_booking_day(day)
+        for day in signup_days:
+            rebuild_signup_day(day)
+
+        state.last_run_at = started
+        state.save(update_fields=['last_run_at'])
+
+    return len(booking_days), len(signup_days)
@@ -0,0 +1,94 @@
+# backend/api/documents.py
+
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+def document_response(storage, name, range_header=None):
+    """
+    Builds the response for a private document.
+
+    When PRIVATE_MEDIA_SENDFILE is set, the response only carries an
+    X-Accel-Redirect (nginx) or X-Sendfile (Apache) header and the front proxy
+    streams the file, including Range requests. Otherwise Django streams it
+    itself, which is only meant for local development.
+    """
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+    if settings.PRIVATE_MEDIA_SENDFILE == 'x-accel-redirect':
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = settings.PRIVATE_MEDIA_INTERNAL_URL + name
+    elif settings.PRIVATE_MEDIA_SENDFILE == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = storage.path(name)
+    else:
+        response = stream_response(storage, name, content_type, range_header)
+
+    # Signed links must not end up in shared caches
+    response['Cache-Control'] = 'private, no-store'
+    return response
+
+
+def stream_response(storage, name, content_type, range_header):
+    size = storage.size(name)
+    byte_range = parse_range(range_header, size)
+
+    if byte_range is None:
+        response = FileResponse(storage.open(name, 'rb'), content_type=content_type)
+    elif byte_range == 'unsatisfiable':
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            read_range(storage.open(name, 'rb'), start, end - start + 1),
+            status=206,
+            content_type=content_type,
+        )
+        response['Content-Length'] = str(end - start + 1)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+
+    response['Accept-Ranges'] = 'bytes'
+    response['Content-Disposition'] = f'inline; filename="{os.path.basename(name)}"'
+    return response
+
+
+def parse_range(header, size):
+    """
+    Parses a single-range `Range: bytes=...` header into inclusive (start, end).
+    Returns None to serve the whole file (no header, or one we don't support)
+    and 'unsatisfiable' when the range is outside the file.
+    """
+    match = RANGE_RE.match(header or '')
+    if not match or match.groups() == ('', ''):
+        return None
+
+    first, last = match.groups()
+    if first == '':
+        # Suffix range: the last N bytes
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+
+    if start >= size or start > end:
+        return 'unsatisfiable'
+    return start, end
+
+
+def read_range(file, start, length):
+    with file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
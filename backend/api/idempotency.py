@@ -0,0 +1,138 @@
+# backend/api/idempotency.py
+
+import hashlib
+import json
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import exceptions, status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyKeyReused(exceptions.APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = 'This Idempotency-Key was already used for a different request.'
+    default_code = 'idempotency_key_reused'
+
+
+class IdempotencyKeyInProgress(exceptions.APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'A request with this Idempotency-Key is still being processed. Please retry shortly.'
+    default_code = 'idempotency_key_in_progress'
+
+    def __init__(self, wait=None, detail=None, code=None):
+        # DRF's exception handler turns `wait` into a Retry-After header
+        self.wait = wait
+        super().__init__(detail, code)
+
+
+def describe(value):
+    # Uploaded files are identified by name and size rather than read again
+    if isinstance(value, UploadedFile):
+        return {'name': value.name, 'size': value.size}
+    return str(value)
+
+
+def request_fingerprint(request):
+    data = request.data
+    if hasattr(data, 'lists'):
+        data = dict(data.lists())  # QueryDict (form and multipart bodies)
+    body = json.dumps(data, sort_keys=True, default=describe)
+    return hashlib.sha256(f"{request.method} {request.path}\n{body}".encode()).hexdigest()
+
+
+def claim(user, key, fingerprint):
+    """
+    Returns (record, True) when this request now owns the key and must run, or
+    (record, False) with the record of the request that used the key first.
+    """
+    now = timezone.now()
+    config = settings.IDEMPOTENCY
+
+    # Expired keys, and keys of requests that died without releasing them, are free again
+    IdempotencyKey.objects.filter(user=user, key=key).filter(
+        Q(expires_at__lte=now)
+        | Q(status='in_progress', created_at__lte=now - timedelta(seconds=config['LOCK_TIMEOUT']))
+    ).delete()
+
+    while True:
+        try:
+            # The unique constraint decides which of several concurrent requests wins
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(
+                    user=user, key=key, fingerprint=fingerprint,
+                    expires_at=now + timedelta(hours=config['TTL_HOURS']),
+                )
+            return record, True
+        except IntegrityError:
+            record = IdempotencyKey.objects.filter(user=user, key=key).first()
+            if record is not None:
+                return record, False
+            # Released between our insert and read: try again
+
+
+class IdempotentCreateMixin:
+    """
+    Makes `create` safe to retry. The first response to a request sent with an
+    `Idempotency-Key` header is stored for IDEMPOTENCY['TTL_HOURS'] and returned
+    as-is to retries, without running validation or `perform_create` again.
+    A duplicate that arrives while the first request is still running waits for
+    its response instead. Keys are scoped to the authenticated user.
+
+    Failed requests (validation errors, permission errors, ...) are not stored,
+    so the client can fix the request and retry with the same key.
+    """
+
+    def create(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return super().create(request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            raise exceptions.ValidationError({HEADER: f"Must be at most {MAX_KEY_LENGTH} characters."})
+
+        config = settings.IDEMPOTENCY
+        fingerprint = request_fingerprint(request)
+        deadline = time.monotonic() + config['WAIT_TIMEOUT']
+
+        record, claimed = claim(request.user, key, fingerprint)
+        while not claimed:
+            if record.fingerprint != fingerprint:
+                raise IdempotencyKeyReused()
+            if record.status == 'completed':
+                return self.replay(record)
+            if time.monotonic() >= deadline:
+                raise IdempotencyKeyInProgress(wait=config['WAIT_TIMEOUT'])
+
+            time.sleep(config['POLL_INTERVAL'])
+            record = IdempotencyKey.objects.filter(pk=record.pk).first()
+            if record is None:
+                # The first request failed and released the key, so this one runs instead
+                record, claimed = claim(request.user, key, fingerprint)
+
+        try:
+            with transaction.atomic():
+                response = super().create(request, *args, **kwargs)
+                # Stored in the same transaction as the new object, so a retry
+                # either replays this response or runs the request again
+                IdempotencyKey.objects.filter(pk=record.pk).update(
+                    status='completed', response_status=response.status_code, response_body=response.data,
+                )
+        except Exception:
+            IdempotencyKey.objects.filter(pk=record.pk).delete()
+            raise
+        return response
+
+    def replay(self, record):
+        headers = self.get_success_headers(record.response_body)
+        headers['Idempotent-Replayed'] = 'true'
+        return Response(record.response_body, status=record.response_status, headers=headers)
@@ -0,0 +1,85 @@
+# backend/api/listings.py
+
+from .models import OwnerProfile, Residence, PublicResidenceListing
+
+
+def listing_fields(residence):
+    """
+    Builds the PublicResidenceListing columns for a residence. Expects `owner`,
+    `owner.ownerprofile` and `photos` to be loaded (or loads them).
+    """
+    owner = residence.owner
+    try:
+        owner_is_active = owner.ownerprofile.account_status == 'active'
+    except OwnerProfile.DoesNotExist:
+        owner_is_active = False
+
+    # Ordered by id so the cover photo matches residence.photos.first()
+    photos = [
+        {'id': photo.id, 'image': photo.image.url}
+        for photo in sorted(residence.photos.all(), key=lambda photo: photo.id)
+    ]
+
+    return {
+        'is_visible': residence.is_available and owner_is_active,
+        'title': residence.title,
+        'description': residence.description,
+        'address': residence.address,
+        'city': residence.city,
+        'country': residence.country,
+        'price_per_night': residence.price_per_night,
+        'conditions': residence.conditions,
+        'owner_id': owner.id,
+        'owner_first_name': owner.first_name,
+        'cover_photo_url': photos[0]['image'] if photos else None,
+        'photo_count': len(photos),
+        'photos': photos,
+        'created_at': residence.created_at,
+    }
+
+
+def source_queryset():
+    return Residence.objects.select_related('owner__ownerprofile').prefetch_related('photos')
+
+
+def refresh_listing(residence_id):
+    """
+    Re-copies one residence into its public listing row.
+    """
+    residence = source_queryset().filter(pk=residence_id).first()
+    if residence is None:
+        # The residence was deleted; its listing goes with it (on_delete=CASCADE)
+        return
+    PublicResidenceListing.objects.update_or_create(residence=residence, defaults=listing_fields(residence))
+
+
+def refresh_owner_listings(owner_id):
+    """
+    Re-copies every residence of an owner, e.g. after their name or account status changed.
+    """
+    for residence_id in Residence.objects.filter(owner_id=owner_id).values_list('id', flat=True):
+        refresh_listing(residence_id)
+
+
+def rebuild_listings(batch_size=500):
+    """
+    Rebuilds every listing from scratch in batches and returns the number of listings written.
+    """
+    written = 0
+    last_id = 0
+    while True:
+        residences = list(source_queryset().filter(pk__gt=last_id).order_by('pk')[:batch_size])
+        if not residences:
+            break
+
+        listings = [PublicResidenceListing(residence=r, **listing_fields(r)) for r in residences]
+        PublicResidenceListing.objects.bulk_create(
+            listings,
+            update_conflicts=True,
+            unique_fields=['residence'],
+            update_fields=list(listing_fields(residences[0])),
+        )
+        written += len(listings)
+        last_id = residences[-1].pk
+
+    return written
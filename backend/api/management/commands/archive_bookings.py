@@ -0,0 +1,73 @@
+# backend/api/management/commands/archive_bookings.py
+
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from api.models import ArchivedBooking, Booking
+
+logger = logging.getLogger(__name__)
+
+ARCHIVED_FIELDS = (
+    'id', 'guest_id', 'residence_id', 'check_in_date', 'check_out_date',
+    'status', 'total_price', 'created_at', 'updated_at',
+)
+
+
+class Command(BaseCommand):
+    help = "Moves past and cancelled bookings older than BOOKING_ARCHIVE_AFTER_DAYS to the archive table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.BOOKING_ARCHIVE_AFTER_DAYS,
+                            help="Archive bookings that ended or were cancelled more than this many days ago.")
+        parser.add_argument('--batch-size', type=int, default=settings.BOOKING_ARCHIVE_BATCH_SIZE,
+                            help="Maximum number of bookings moved per transaction.")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        archived, batches = self.archive(options['days'], options['batch_size'])
+        elapsed = time.monotonic() - started
+
+        logger.info("bookings.archived count=%d batches=%d duration_ms=%d", archived, batches, elapsed * 1000)
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {archived} booking(s) in {batches} batch(es) ({elapsed:.2f}s)."
+        ))
+
+    def archive(self, days, batch_size):
+        cutoff = timezone.now() - timedelta(days=days)
+        eligible = (
+            Q(check_out_date__lt=cutoff.date())
+            | Q(status='cancelled', updated_at__lt=cutoff)
+        )
+        archived = 0
+        batches = 0
+
+        while True:
+            with transaction.atomic():
+                # skip_locked lets several nodes archive at once (no-op on SQLite)
+                rows = list(
+                    Booking.objects
+                    .select_for_update(skip_locked=True)
+                    .filter(eligible)
+                    .order_by('pk')
+                    .values(*ARCHIVED_FIELDS)[:batch_size]
+                )
+                if not rows:
+                    break
+
+                # Copy and delete in the same transaction, so a booking is never in both tables
+                ArchivedBooking.objects.bulk_create([ArchivedBooking(**row) for row in rows])
+                Booking.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+                archived += len(rows)
+                batches += 1
+
+            if len(rows) < batch_size:
+                break
+
+        return archived, batches
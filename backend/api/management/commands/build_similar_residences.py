@@ -0,0 +1,33 @@
+# backend/api/management/commands/build_similar_residences.py
+
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Refreshes the precomputed 'similar residences' neighbor table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--k', type=int, default=10,
+                            help="Number of neighbors stored per residence.")
+        parser.add_argument('--block-size', type=int, default=256,
+                            help="Residences scored per matrix block.")
+        parser.add_argument('--full', action='store_true',
+                            help="Recompute every residence instead of only the ones that changed.")
+
+    def handle(self, *args, **options):
+        # NumPy is only needed by this batch job, not by web workers
+        from api.similarity import rebuild_neighbors
+
+        started = time.monotonic()
+        refreshed = rebuild_neighbors(k=options['k'], block_size=options['block_size'], full=options['full'])
+        elapsed = time.monotonic() - started
+
+        logger.info("similar_residences.rebuilt residences=%d duration_ms=%d", refreshed, elapsed * 1000)
+        self.stdout.write(self.style.SUCCESS(
+            f"Refreshed the neighbors of {refreshed} residence(s) ({elapsed:.2f}s)."
+        ))
@@ -0,0 +1,42 @@
+# backend/api/management/commands/dispatch_outbox.py
+
+import logging
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.outbox import dispatch_batch
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Delivers pending outbox events (emails, webhooks) with retries and backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.OUTBOX_BATCH_SIZE,
+                            help="Maximum number of events claimed per batch.")
+        parser.add_argument('--interval', type=int, default=0,
+                            help="Run forever as a worker, sleeping this many seconds when the outbox is empty.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        while True:
+            totals = [0, 0, 0]
+            while True:
+                counts = dispatch_batch(batch_size)
+                totals = [t + c for t, c in zip(totals, counts)]
+                # Keep draining while batches come back full
+                if sum(counts) < batch_size:
+                    break
+
+            sent, retried, failed = totals
+            if sent or retried or failed:
+                logger.info("outbox.dispatched sent=%d retried=%d failed=%d", sent, retried, failed)
+                self.stdout.write(f"Sent {sent}, retried {retried}, failed {failed} outbox event(s).")
+
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,35 @@
+# backend/api/management/commands/move_id_documents_private.py
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from api.models import OwnerProfile
+from api.storage import get_private_storage
+
+
+class Command(BaseCommand):
+    help = "Copies identity documents uploaded before private storage existed out of the public media storage."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--delete', action='store_true',
+                            help="Delete the public copy once it has been copied.")
+
+    def handle(self, *args, **options):
+        private_storage = get_private_storage()
+        moved = 0
+
+        for profile in OwnerProfile.objects.iterator():
+            for field in ('id_front_photo', 'id_back_photo'):
+                name = getattr(profile, field).name
+                if not name or private_storage.exists(name) or not default_storage.exists(name):
+                    continue
+
+                with default_storage.open(name, 'rb') as public_file:
+                    saved_name = private_storage.save(name, public_file)
+                if saved_name != name:
+                    OwnerProfile.objects.filter(pk=profile.pk).update(**{field: saved_name})
+                if options['delete']:
+                    default_storage.delete(name)
+                moved += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Moved {moved} identity document(s) to private storage."))
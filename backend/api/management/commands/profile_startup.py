@@ -0,0 +1,97 @@
+# backend/api/management/commands/profile_startup.py
+
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Runs in a fresh interpreter so that we measure a real cold start
+PROBE_SCRIPT = """
+import json, os, sys, time
+from wsgiref.util import setup_testing_defaults
+
+started = time.perf_counter()
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+import django
+from django.conf import settings
+django.setup()
+apps_ready = time.perf_counter()
+
+from core.wsgi import application
+app_loaded = time.perf_counter()
+
+host = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'localhost'
+environ = {'PATH_INFO': sys.argv[1], 'HTTP_HOST': host, 'SERVER_NAME': host}
+setup_testing_defaults(environ)
+status = []
+body = b''.join(application(environ, lambda s, headers, exc_info=None: status.append(s)))
+responded = time.perf_counter()
+
+print(json.dumps({
+    'apps_ready_ms': (apps_ready - started) * 1000,
+    'app_loaded_ms': (app_loaded - apps_ready) * 1000,
+    'first_response_ms': (responded - app_loaded) * 1000,
+    'total_ms': (responded - started) * 1000,
+    'status': status[0],
+}))
+"""
+
+
+class Command(BaseCommand):
+    help = "Measures import time per package, app-ready time and time to first response of a cold process."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/api/residences/public/',
+                            help="URL requested as the first request.")
+        parser.add_argument('--top', type=int, default=15,
+                            help="Number of packages to list in the import report.")
+        parser.add_argument('--compare', action='store_true',
+                            help="Also measure with the start-up warm-up disabled.")
+
+    def handle(self, *args, **options):
+        imports, timings = self.probe(options['path'], warmup=True)
+
+        self.stdout.write("Import time by top-level package:")
+        for package, micros in sorted(imports.items(), key=lambda item: item[1], reverse=True)[:options['top']]:
+            self.stdout.write(f"  {package:<40} {micros / 1000:8.1f} ms")
+        self.stdout.write(f"  {'(all imports)':<40} {sum(imports.values()) / 1000:8.1f} ms")
+
+        self.stdout.write("")
+        self.report("With warm-up", timings)
+
+        if options['compare']:
+            _, cold_timings = self.probe(options['path'], warmup=False)
+            self.report("Without warm-up", cold_timings)
+
+    def probe(self, path, warmup):
+        env = dict(os.environ, WARMUP_ON_START=str(warmup), DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'core.settings'))
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', PROBE_SCRIPT, path],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True,
+        )
+        return self.parse_importtime(result.stderr), json.loads(result.stdout.strip().splitlines()[-1])
+
+    def parse_importtime(self, output):
+        """
+        Sums the self time of every module reported by `-X importtime` per
+        top-level package, in microseconds. Self time is used so a package isn't
+        charged for the other packages it happens to import first.
+        """
+        packages = defaultdict(int)
+        for line in output.splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+            self_time, _, name = line[len('import time:'):].split('|')
+            packages[name.strip().split('.')[0]] += int(self_time)
+        return packages
+
+    def report(self, label, timings):
+        self.stdout.write(f"{label}:")
+        self.stdout.write(f"  App registry ready:     {timings['apps_ready_ms']:8.1f} ms")
+        self.stdout.write(f"  WSGI application ready: {timings['app_loaded_ms']:8.1f} ms")
+        self.stdout.write(f"  First response:         {timings['first_response_ms']:8.1f} ms  ({timings['status']})")
+        self.stdout.write(f"  Time to first response: {timings['total_ms']:8.1f} ms")
@@ -0,0 +1,45 @@
+# backend/api/management/commands/purge_booking_notifications.py
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.models import BookingNotification
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Deletes booking stream notifications older than BOOKING_STREAM['RETENTION_HOURS']."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=settings.BOOKING_STREAM['RETENTION_HOURS'],
+                            help="Keep notifications from the last this many hours.")
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Maximum number of notifications deleted per query.")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['hours'])
+
+        # Ids grow with created_at, so every expired row sits below the first
+        # recent id and can be deleted by primary key range
+        first_kept = (
+            BookingNotification.objects.filter(created_at__gte=cutoff)
+            .order_by('id').values_list('id', flat=True).first()
+        )
+        expired = BookingNotification.objects.all()
+        if first_kept is not None:
+            expired = expired.filter(id__lt=first_kept)
+
+        deleted = 0
+        while True:
+            ids = list(expired.order_by('id').values_list('id', flat=True)[:options['batch_size']])
+            if not ids:
+                break
+            deleted += BookingNotification.objects.filter(id__in=ids).delete()[0]
+
+        logger.info("booking_notifications.purged count=%d", deleted)
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} booking notification(s)."))
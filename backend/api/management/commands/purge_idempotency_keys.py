@@ -0,0 +1,20 @@
+# backend/api/management/commands/purge_idempotency_keys.py
+
+import logging
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.models import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Deletes stored Idempotency-Key responses whose replay window has passed."
+
+    def handle(self, *args, **options):
+        deleted, _ = IdempotencyKey.objects.filter(expires_at__lte=timezone.now()).delete()
+
+        logger.info("idempotency_keys.purged count=%d", deleted)
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired idempotency key(s)."))
@@ -0,0 +1,24 @@
+# backend/api/management/commands/rebuild_public_listings.py
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.listings import rebuild_listings
+from api.models import PublicResidenceListing, Residence
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the PublicResidenceListing table from residences, photos and owners."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            # Listings are removed with their residence, but clear any leftovers anyway
+            orphans, _ = PublicResidenceListing.objects.exclude(residence__in=Residence.objects.all()).delete()
+            written = rebuild_listings(options['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {written} public listing(s), removed {orphans} orphan(s)."
+        ))
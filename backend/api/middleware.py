@@ -0,0 +1,20 @@
+# backend/api/middleware.py
+
+import time
+
+from .throttling import LatencyMonitor
+
+
+class LatencyMonitorMiddleware:
+    """
+    Measures how long each request takes and feeds it to the load-shedding monitor.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.monotonic()
+        response = self.get_response(request)
+        LatencyMonitor.record((time.monotonic() - started) * 1000)
+        return response
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.3 on 2026-10-19 11:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_outboxevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='total_price',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True),
+        ),
+        migrations.CreateModel(
+            name='PricingRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rule_type', models.CharField(choices=[('season', 'Seasonal price'), ('weekend', 'Weekend price'), ('length_of_stay', 'Length-of-stay discount')], max_length=20)),
+                ('start_date', models.DateField(blank=True, null=True)),
+                ('end_date', models.DateField(blank=True, null=True)),
+                ('price_per_night', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('min_nights', models.PositiveIntegerField(blank=True, null=True)),
+                ('discount_percent', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True)),
+                ('residence', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pricing_rules', to='api.residence')),
+            ],
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.3 on 2026-10-19 11:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_pricingrule_booking_total_price'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PublicResidenceListing',
+            fields=[
+                ('residence', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='listing', serialize=False, to='api.residence')),
+                ('is_visible', models.BooleanField(default=False)),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField()),
+                ('address', models.CharField(max_length=255)),
+                ('city', models.CharField(max_length=100)),
+                ('country', models.CharField(max_length=100)),
+                ('price_per_night', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('conditions', models.TextField(blank=True, null=True)),
+                ('owner_id', models.BigIntegerField()),
+                ('owner_first_name', models.CharField(blank=True, max_length=150)),
+                ('cover_photo_url', models.CharField(blank=True, max_length=500, null=True)),
+                ('photo_count', models.PositiveIntegerField(default=0)),
+                ('photos', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['is_visible', 'residence'], name='listing_visible_idx'), models.Index(fields=['is_visible', 'city'], name='listing_visible_city_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.3 on 2026-10-19 11:59
+
+import api.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_publicresidencelisting'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ownerprofile',
+            name='id_back_photo',
+            field=models.ImageField(storage=api.storage.get_private_storage, upload_to='id_documents/'),
+        ),
+        migrations.AlterField(
+            model_name='ownerprofile',
+            name='id_front_photo',
+            field=models.ImageField(storage=api.storage.get_private_storage, upload_to='id_documents/'),
+        ),
+    ]
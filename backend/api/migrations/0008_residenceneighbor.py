@@ -0,0 +1,27 @@
+# Generated by Django 5.2.3 on 2026-10-19 12:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_analytics_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResidenceNeighbor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('neighbor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbor_of', to='api.residence')),
+                ('residence', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbors', to='api.residence')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('residence', 'rank'), name='unique_residence_neighbor_rank')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.3 on 2026-10-19 12:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='archivedbooking',
+            index=models.Index(fields=['residence', 'created_at'], name='archived_booking_res_idx'),
+        ),
+    ]
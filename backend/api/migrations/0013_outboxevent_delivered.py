@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-19 12:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_archivedbooking_residence_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxevent',
+            name='delivered',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
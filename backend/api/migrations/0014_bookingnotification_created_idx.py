@@ -0,0 +1,17 @@
+# Generated by Django 5.2.3 on 2026-10-19 12:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_outboxevent_delivered'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bookingnotification',
+            index=models.Index(fields=['created_at'], name='notification_created_idx'),
+        ),
+    ]
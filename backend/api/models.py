@@ -1,8 +1,13 @@
 # backend/api/models.py
 
 from django.db import models
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
 from django.contrib.auth.models import AbstractUser
 
+from .storage import get_private_storage
+
 # It's best practice to use a custom user model from the start.
 class User(AbstractUser):
     email = models.EmailField(unique=True)
@@ -28,14 +33,17 @@ class OwnerProfile(models.Model):
     # Owner-specific fields
     address = models.CharField(max_length=255)
     phone_number = models.CharField(max_length=20)
-    id_front_photo = models.ImageField(upload_to='id_documents/')
-    id_back_photo = models.ImageField(upload_to='id_documents/')
+    # Identity documents never go to the public media storage (see api/storage.py)
+    id_front_photo = models.ImageField(upload_to='id_documents/', storage=get_private_storage)
+    id_back_photo = models.ImageField(upload_to='id_documents/', storage=get_private_storage)
     residences_to_publish = models.PositiveIntegerField(default=1)
     account_status = models.CharField(
         max_length=10,
         choices=ACCOUNT_STATUS_CHOICES,
         default='pending' # New accounts will be pending approval by default
     )
+    # Lets the analytics rollup job find profiles that changed since its last run
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"Profile of {self.user.first_name} {self.user.last_name}"
@@ -58,6 +66,57 @@ class Residence(models.Model):
         return self.title
 
 
+class PricingRule(models.Model):
+    """
+    Adjusts the nightly price of a residence. See api/pricing.py for how rules combine.
+    """
+    RULE_TYPE_CHOICES = [
+        ('season', 'Seasonal price'),        # price_per_night for nights in [start_date, end_date)
+        ('weekend', 'Weekend price'),        # price_per_night for Friday and Saturday nights
+        ('length_of_stay', 'Length-of-stay discount'),  # discount_percent for stays >= min_nights
+    ]
+
+    residence = models.ForeignKey(Residence, on_delete=models.CASCADE, related_name='pricing_rules')
+    rule_type = models.CharField(max_length=20, choices=RULE_TYPE_CHOICES)
+    start_date = models.DateField(blank=True, null=True)
+    end_date = models.DateField(blank=True, null=True)
+    price_per_night = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
+    min_nights = models.PositiveIntegerField(blank=True, null=True)
+    discount_percent = models.DecimalField(max_digits=5, decimal_places=2, blank=True, null=True)
+
+    # Fields each rule type needs to be priced
+    REQUIRED_FIELDS = {
+        'season': ('start_date', 'end_date', 'price_per_night'),
+        'weekend': ('price_per_night',),
+        'length_of_stay': ('min_nights', 'discount_percent'),
+    }
+
+    def clean(self):
+        # Runs for the admin and for PricingRuleSerializer, so both reject rules quote() can't price
+        missing = {
+            field: "This field is required for this rule type."
+            for field in self.REQUIRED_FIELDS.get(self.rule_type, ())
+            if getattr(self, field) is None
+        }
+        if missing:
+            raise ValidationError(missing)
+
+        if self.rule_type == 'season' and self.start_date >= self.end_date:
+            raise ValidationError({'end_date': "The season must end after it starts."})
+        if self.rule_type == 'length_of_stay' and not 0 < self.discount_percent <= 100:
+            raise ValidationError({'discount_percent': "The discount must be between 0 and 100 percent."})
+        if self.rule_type == 'weekend' and self.residence_id is not None:
+            others = PricingRule.objects.filter(residence_id=self.residence_id, rule_type='weekend').exclude(pk=self.pk)
+            if others.exists():
+                raise ValidationError({'rule_type': "This residence already has a weekend rule."})
+
+    def is_complete(self):
+        return all(getattr(self, field) is not None for field in self.REQUIRED_FIELDS.get(self.rule_type, ()))
+
+    def __str__(self):
+        return f"{self.get_rule_type_display()} for {self.residence.title}"
+
+
 class ResidencePhoto(models.Model):
     residence = models.ForeignKey(Residence, on_delete=models.CASCADE, related_name='photos')
     image = models.ImageField(upload_to='residence_photos/')
@@ -66,6 +125,59 @@ class ResidencePhoto(models.Model):
         return f"Photo for {self.residence.title}"
 
 
+class PublicResidenceListing(models.Model):
+    """
+    A flattened, read-only copy of everything the public residence views show.
+    Kept in sync by api/signals.py so public reads touch a single table;
+    run `manage.py rebuild_public_listings` to repair drift.
+    """
+    residence = models.OneToOneField(Residence, on_delete=models.CASCADE, primary_key=True, related_name='listing')
+    # True when the residence is available and its owner's account is active
+    is_visible = models.BooleanField(default=False)
+    title = models.CharField(max_length=200)
+    description = models.TextField()
+    address = models.CharField(max_length=255)
+    city = models.CharField(max_length=100)
+    country = models.CharField(max_length=100)
+    price_per_night = models.DecimalField(max_digits=10, decimal_places=2)
+    conditions = models.TextField(blank=True, null=True)
+    owner_id = models.BigIntegerField()
+    owner_first_name = models.CharField(max_length=150, blank=True)
+    cover_photo_url = models.CharField(max_length=500, blank=True, null=True)
+    photo_count = models.PositiveIntegerField(default=0)
+    # [{'id': ..., 'image': url}, ...] in the same order as residence.photos
+    photos = models.JSONField(default=list)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['is_visible', 'residence'], name='listing_visible_idx'),
+            models.Index(fields=['is_visible', 'city'], name='listing_visible_city_idx'),
+        ]
+
+    def __str__(self):
+        return f"Listing for {self.title}"
+
+
+class ResidenceNeighbor(models.Model):
+    """
+    Precomputed "similar residences": the top-k neighbors of each active
+    residence, written by `manage.py build_similar_residences`.
+    """
+    residence = models.ForeignKey(Residence, on_delete=models.CASCADE, related_name='neighbors')
+    neighbor = models.ForeignKey(Residence, on_delete=models.CASCADE, related_name='neighbor_of')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['residence', 'rank'], name='unique_residence_neighbor_rank'),
+        ]
+
+    def __str__(self):
+        return f"{self.neighbor_id} similar to {self.residence_id}"
+
+
 class Booking(models.Model):
     BOOKING_STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -82,7 +194,188 @@ class Booking(models.Model):
         choices=BOOKING_STATUS_CHOICES,
         default='pending'
     )
+    # Stay total computed by api/pricing.py when the booking is made
+    total_price = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Bulk update() calls must set this explicitly (see expire_pending_bookings)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Lets the pending-booking sweeper find stale rows without a full scan
+            models.Index(fields=['status', 'created_at'], name='booking_status_created_idx'),
+            # Lets the analytics rollup job find bookings changed since its last run
+            models.Index(fields=['updated_at'], name='booking_updated_idx'),
+            models.Index(fields=['created_at'], name='booking_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"Booking for {self.residence.title} by {self.guest.first_name}"
+
+
+class ArchivedBooking(models.Model):
+    """
+    Past and cancelled bookings moved out of the Booking table by
+    `manage.py archive_bookings`, keeping their original id.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    guest = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_bookings')
+    residence = models.ForeignKey(Residence, on_delete=models.CASCADE, related_name='archived_bookings')
+    check_in_date = models.DateField()
+    check_out_date = models.DateField()
+    status = models.CharField(max_length=10, choices=Booking.BOOKING_STATUS_CHOICES)
+    total_price = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='archived_booking_created_idx'),
+            # Owner history: the archived bookings of each residence, newest first
+            models.Index(fields=['residence', 'created_at'], name='archived_booking_res_idx'),
+        ]
+
+    def __str__(self):
+        return f"Archived booking for {self.residence.title} by {self.guest.first_name}"
+
+
+class BookingNotification(models.Model):
+    """
+    A booking change pushed to the owner's live stream (api/streams.py). The id
+    doubles as the SSE event id, so reconnecting clients resume with Last-Event-ID.
+    """
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='booking_notifications')
+    event_type = models.CharField(max_length=50)
+    # The booking as returned by BookingSerializer when the event happened
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', 'id'], name='notification_owner_id_idx'),
+            # Late-commit re-reads of the stream and the retention purge
+            models.Index(fields=['created_at'], name='notification_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} for {self.owner_id}"
+
+
+class OutboxEvent(models.Model):
+    """
+    A domain event written in the same transaction as the change that caused it.
+    The `dispatch_outbox` command delivers these (emails, webhooks) outside of
+    the request/response cycle.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    event_type = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    # Channels ('email', 'webhook:<url>') already delivered, skipped on retries
+    delivered = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            # The dispatcher polls for due events with this index
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_status_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} ({self.status})"
+
+
+class IdempotencyKey(models.Model):
+    """
+    The first response to a POST sent with an `Idempotency-Key` header, replayed
+    to retries of the same request until `expires_at` (see api/idempotency.py).
+    """
+    STATUS_CHOICES = [
+        ('in_progress', 'In progress'),
+        ('completed', 'Completed'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    key = models.CharField(max_length=255)
+    # Hash of the method, path and body, so a key reused for another request is rejected
+    fingerprint = models.CharField(max_length=64)
+    status = models.CharField(max_length=12, choices=STATUS_CHOICES, default='in_progress')
+    response_status = models.PositiveSmallIntegerField(blank=True, null=True)
+    response_body = models.JSONField(blank=True, null=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='unique_idempotency_key'),
+        ]
+        indexes = [
+            models.Index(fields=['expires_at'], name='idempotency_expires_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.key} ({self.status})"
+
+
+# --- Analytics rollups (maintained by `manage.py update_analytics_rollups`) ---
+
+class DailyBookingStats(models.Model):
+    """
+    Booking totals for one day, city and owner. Bookings are counted on the day
+    they were created, with their current status.
+    """
+    date = models.DateField()
+    city = models.CharField(max_length=100)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    bookings_created = models.PositiveIntegerField(default=0)
+    bookings_confirmed = models.PositiveIntegerField(default=0)
+    bookings_cancelled = models.PositiveIntegerField(default=0)
+    # Nights and value of the confirmed bookings
+    occupied_nights = models.PositiveIntegerField(default=0)
+    gross_booking_value = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'city', 'owner'], name='unique_daily_booking_stats'),
+        ]
+
+    def __str__(self):
+        return f"Bookings on {self.date} in {self.city}"
+
+
+class DailyOwnerSignupStats(models.Model):
+    """
+    Owners who joined on a given day, by their current account status.
+    """
+    date = models.DateField()
+    account_status = models.CharField(max_length=10, choices=OwnerProfile.ACCOUNT_STATUS_CHOICES)
+    new_owners = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'account_status'], name='unique_daily_owner_signup_stats'),
+        ]
+
+    def __str__(self):
+        return f"Owner sign-ups on {self.date} ({self.account_status})"
+
+
+class RollupState(models.Model):
+    """
+    Watermark of a periodic job: rows changed after `last_run_at` still need processing.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    last_run_at = models.DateTimeField(blank=True, null=True)
 
     def __str__(self):
-        return f"Booking for {self.residence.title} by {self.guest.first_name}"
\ No newline at end of file
+        return self.name
\ No newline at end of file
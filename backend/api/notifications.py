@@ -0,0 +1,40 @@
+# backend/api/notifications.py
+
+from .models import Booking, BookingNotification
+from .outbox import BOOKING_CREATED, BOOKING_STATUS_CHANGED
+from .serializers import BookingSerializer
+
+
+def notify_owner(booking, event_type):
+    """
+    Records a booking event for the owner's live stream. Call it in the same
+    transaction as the booking change.
+    """
+    return BookingNotification.objects.create(
+        owner_id=booking.residence.owner_id,
+        event_type=event_type,
+        payload=BookingSerializer(booking).data,
+    )
+
+
+def notify_booking_created(booking):
+    return notify_owner(booking, BOOKING_CREATED)
+
+
+def notify_booking_status_changed(booking):
+    return notify_owner(booking, BOOKING_STATUS_CHANGED)
+
+
+def notify_bookings_status_changed(booking_ids):
+    """
+    Bulk version for jobs that change many bookings with update().
+    """
+    bookings = Booking.objects.filter(pk__in=booking_ids).select_related('guest', 'residence__owner')
+    BookingNotification.objects.bulk_create(
+        BookingNotification(
+            owner_id=booking.residence.owner_id,
+            event_type=BOOKING_STATUS_CHANGED,
+            payload=BookingSerializer(booking).data,
+        )
+        for booking in bookings
+    )
@@ -0,0 +1,216 @@
+# backend/api/outbox.py
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+BOOKING_CREATED = 'booking.created'
+BOOKING_STATUS_CHANGED = 'booking.status_changed'
+OWNER_ACCOUNT_APPROVED = 'owner.account_approved'
+
+
+# --- Writing events ---
+# These must be called inside the same transaction as the change they describe,
+# so an event exists if and only if the change was committed.
+
+def booking_payload(booking):
+    residence = booking.residence
+    return {
+        'booking_id': booking.id,
+        'residence_id': residence.id,
+        'residence_title': residence.title,
+        'check_in_date': booking.check_in_date.isoformat(),
+        'check_out_date': booking.check_out_date.isoformat(),
+        'status': booking.status,
+        'total_price': str(booking.total_price) if booking.total_price is not None else None,
+        'guest_email': booking.guest.email,
+        'guest_first_name': booking.guest.first_name,
+        'owner_id': residence.owner_id,
+        'owner_email': residence.owner.email,
+        'owner_first_name': residence.owner.first_name,
+    }
+
+
+def enqueue(event_type, payload):
+    return OutboxEvent.objects.create(event_type=event_type, payload=payload)
+
+
+def enqueue_booking_created(booking):
+    return enqueue(BOOKING_CREATED, booking_payload(booking))
+
+
+def enqueue_booking_status_changed(booking):
+    return enqueue(BOOKING_STATUS_CHANGED, booking_payload(booking))
+
+
+def enqueue_owner_account_approved(profile):
+    return enqueue(OWNER_ACCOUNT_APPROVED, {
+        'owner_id': profile.user_id,
+        'owner_email': profile.user.email,
+        'owner_first_name': profile.user.first_name,
+    })
+
+
+# --- Delivering events ---
+
+def build_email(event):
+    """
+    Returns (recipient, subject, body) for events that send an email, or None.
+    """
+    data = event.payload
+    if event.event_type == BOOKING_CREATED:
+        return (
+            data['owner_email'],
+            f"New booking request for {data['residence_title']}",
+            f"Hello {data['owner_first_name']},\n\n"
+            f"{data['guest_first_name']} would like to book {data['residence_title']} "
+            f"from {data['check_in_date']} to {data['check_out_date']}.\n"
+            f"Log in to your dashboard to confirm or cancel the request.",
+        )
+    if event.event_type == BOOKING_STATUS_CHANGED and data['status'] == 'confirmed':
+        return (
+            data['guest_email'],
+            f"Your booking for {data['residence_title']} is confirmed",
+            f"Hello {data['guest_first_name']},\n\n"
+            f"Your stay at {data['residence_title']} from {data['check_in_date']} "
+            f"to {data['check_out_date']} has been confirmed by the owner.",
+        )
+    if event.event_type == OWNER_ACCOUNT_APPROVED:
+        return (
+            data['owner_email'],
+            "Your owner account has been approved",
+            f"Hello {data['owner_first_name']},\n\n"
+            "Your account is now active. You can start publishing your residences.",
+        )
+    return None
+
+
+def channels(event):
+    """
+    Returns [(name, send), ...] for every channel the event goes to.
+    """
+    result = []
+
+    email = build_email(event)
+    if email:
+        recipient, subject, body = email
+        result.append(('email', lambda: send_mail(
+            subject, body, settings.DEFAULT_FROM_EMAIL, [recipient], fail_silently=False,
+        )))
+
+    for url in settings.OUTBOX_WEBHOOK_URLS:
+        result.append((f'webhook:{url}', lambda url=url: post_webhook(url, event)))
+
+    return result
+
+
+def post_webhook(url, event):
+    # Imported here because only the dispatcher needs it, not web workers
+    import requests
+
+    response = requests.post(
+        url,
+        json={'id': event.id, 'type': event.event_type, 'payload': event.payload},
+        timeout=settings.OUTBOX_WEBHOOK_TIMEOUT,
+    )
+    response.raise_for_status()
+
+
+def deliver(event):
+    """
+    Sends one event to every configured channel it hasn't reached yet, recording
+    each success right away so a retry never sends the same email or webhook
+    twice. Raises the first failure once every channel was tried, so the
+    dispatcher can schedule a retry.
+    """
+    error = None
+    for name, send in channels(event):
+        if name in event.delivered:
+            continue
+        try:
+            send()
+        except Exception as exc:
+            error = error or exc
+            continue
+        event.delivered.append(name)
+        event.save(update_fields=['delivered'])
+
+    if error is not None:
+        raise error
+
+
+def retry_delay(attempts):
+    """
+    Exponential backoff: base, 2*base, 4*base... capped at OUTBOX_MAX_BACKOFF_SECONDS.
+    """
+    seconds = settings.OUTBOX_BASE_BACKOFF_SECONDS * (2 ** (attempts - 1))
+    return timedelta(seconds=min(seconds, settings.OUTBOX_MAX_BACKOFF_SECONDS))
+
+
+def claim_batch(batch_size):
+    """
+    Claims up to `batch_size` due events by pushing their next_attempt_at past a
+    lease, so other dispatchers skip them while they are being delivered.
+
+    The claim counts as an attempt, so an event that crashes or hangs the
+    dispatcher (and is claimed again when its lease runs out) still ends up failed.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        events = list(
+            OutboxEvent.objects
+            .select_for_update(skip_locked=True)
+            .filter(status='pending', next_attempt_at__lte=now)
+            .order_by('next_attempt_at')[:batch_size]
+        )
+        if events:
+            lease_until = now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+            OutboxEvent.objects.filter(id__in=[e.id for e in events]).update(
+                next_attempt_at=lease_until, attempts=F('attempts') + 1,
+            )
+            for event in events:
+                event.attempts += 1
+    return events
+
+
+def dispatch_batch(batch_size):
+    """
+    Delivers one batch of due events and returns (sent, retried, failed) counts.
+    """
+    sent = retried = failed = 0
+
+    for event in claim_batch(batch_size):
+        try:
+            if event.attempts > settings.OUTBOX_MAX_ATTEMPTS:
+                # Earlier claims never finished (dispatcher crashed or was killed)
+                raise RuntimeError(event.last_error or "Delivery did not complete within its lease.")
+            deliver(event)
+        except Exception as exc:
+            event.last_error = str(exc)
+            if event.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                event.status = 'failed'
+                failed += 1
+                logger.error("outbox.failed id=%d type=%s error=%s", event.id, event.event_type, exc)
+            else:
+                event.next_attempt_at = timezone.now() + retry_delay(event.attempts)
+                retried += 1
+                logger.warning("outbox.retry id=%d type=%s attempt=%d error=%s",
+                               event.id, event.event_type, event.attempts, exc)
+        else:
+            event.status = 'sent'
+            event.sent_at = timezone.now()
+            event.last_error = ''
+            sent += 1
+
+        event.save(update_fields=['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at'])
+
+    return sent, retried, failed
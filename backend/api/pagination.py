@@ -0,0 +1,15 @@
+# backend/api/pagination.py
+
+from rest_framework.pagination import CursorPagination
+
+
+class BookingHistoryPagination(CursorPagination):
+    """
+    Pages through archived bookings newest first. A cursor resumes from the last
+    (created_at, id) seen instead of counting an OFFSET, so deep pages of a
+    large archive cost the same as the first one.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
@@ -0,0 +1,97 @@
+# backend/api/pricing.py
+
+from decimal import Decimal, ROUND_HALF_UP
+
+# Friday and Saturday nights (date.weekday() numbering) use the weekend rate
+WEEKEND_NIGHTS = (4, 5)
+CENTS = Decimal('0.01')
+
+
+def count_weekend_nights(start, end):
+    """
+    Number of nights in [start, end) that fall on a weekend, without iterating
+    over every day of the stay.
+    """
+    nights = (end - start).days
+    full_weeks, remainder = divmod(nights, 7)
+    count = full_weeks * len(WEEKEND_NIGHTS)
+    first_weekday = start.weekday()
+    for offset in range(remainder):
+        if (first_weekday + offset) % 7 in WEEKEND_NIGHTS:
+            count += 1
+    return count
+
+
+def quote(residence, check_in, check_out):
+    """
+    Computes the price of a stay from the residence's base price and its pricing rules.
+
+    - Seasonal rules replace the nightly price for nights inside their range. If
+      seasons overlap, the one that starts last wins.
+    - Outside seasons, the weekend rule replaces the price of Friday and Saturday nights.
+      PricingRule.clean() allows one per residence; if several were saved anyway,
+      the most recently created one wins.
+    - The largest length-of-stay discount whose min_nights is reached is applied to the subtotal.
+
+    The stay is split at season boundaries and each interval is priced in one
+    step, so the cost depends on the number of rules, not the number of nights.
+    Uses `residence.pricing_rules.all()`, so prefetch it when quoting many residences.
+    """
+    # PricingRule.clean() rejects incomplete rules, but rows saved without it
+    # (shell, bulk imports) must not break quotes and bookings
+    rules = [rule for rule in residence.pricing_rules.all() if rule.is_complete()]
+    seasons = [
+        rule for rule in rules
+        if rule.rule_type == 'season' and rule.start_date < check_out and rule.end_date > check_in
+    ]
+    weekend_rule = max((rule for rule in rules if rule.rule_type == 'weekend'), key=lambda r: r.id, default=None)
+    weekend_price = weekend_rule.price_per_night if weekend_rule else None
+
+    # Every point where the applicable nightly price can change
+    boundaries = {check_in, check_out}
+    for season in seasons:
+        boundaries.add(max(season.start_date, check_in))
+        boundaries.add(min(season.end_date, check_out))
+    boundaries = sorted(boundaries)
+
+    subtotal = Decimal('0')
+    for start, end in zip(boundaries, boundaries[1:]):
+        nights = (end - start).days
+        covering = [s for s in seasons if s.start_date <= start and s.end_date >= end]
+        if covering:
+            season = max(covering, key=lambda s: (s.start_date, s.id))
+            subtotal += season.price_per_night * nights
+        elif weekend_price is not None:
+            weekend_nights = count_weekend_nights(start, end)
+            subtotal += weekend_price * weekend_nights + residence.price_per_night * (nights - weekend_nights)
+        else:
+            subtotal += residence.price_per_night * nights
+
+    nights = (check_out - check_in).days
+    discount_percent = max(
+        (rule.discount_percent for rule in rules
+         if rule.rule_type == 'length_of_stay' and rule.min_nights <= nights),
+        default=Decimal('0'),
+    )
+    discount = (subtotal * discount_percent / 100).quantize(CENTS, rounding=ROUND_HALF_UP)
+
+    return {
+        'residence': residence.id,
+        'check_in_date': check_in,
+        'check_out_date': check_out,
+        'nights': nights,
+        'subtotal': subtotal.quantize(CENTS),
+        'discount_percent': discount_percent,
+        'discount': discount,
+        'total': subtotal.quantize(CENTS) - discount,
+    }
+
+
+def quote_many(residences, check_in, check_out):
+    """
+    Quotes the same stay for several residences. Pass a queryset and the pricing
+    rules of all residences are loaded in a single query.
+    """
+    if hasattr(residences, 'prefetch_related'):
+        residences = residences.prefetch_related('pricing_rules')
+    return [quote(residence, check_in, check_out) for residence in residences]
@@ -1,8 +1,12 @@
 # backend/api/serializers.py
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework import serializers
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.utils import timezone
-from .models import User, OwnerProfile, Residence, ResidencePhoto, Booking
+from datetime import timedelta
+from .models import (
+    User, OwnerProfile, Residence, ResidencePhoto, Booking, ArchivedBooking, PricingRule, PublicResidenceListing,
+)
 
 class OwnerProfileSerializer(serializers.ModelSerializer):
     class Meta:
@@ -119,51 +123,56 @@ class ResidenceSerializer(serializers.ModelSerializer):
         return residence
     
     
-# A simple serializer to show non-sensitive owner information
-class PublicOwnerSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = User
-        fields = ('id', 'first_name') # Only show the owner's first name
-
-
 class PublicResidenceListSerializer(serializers.ModelSerializer):
     """
     A lightweight serializer for the public list view of residences.
+    Reads from the denormalized PublicResidenceListing table.
     """
-    # We can add a field to show the first photo as a thumbnail.
+    id = serializers.IntegerField(source='residence_id', read_only=True)
+    # The first photo is used as a thumbnail
     main_photo_url = serializers.SerializerMethodField()
 
     class Meta:
-        model = Residence
+        model = PublicResidenceListing
         fields = ('id', 'title', 'city', 'address', 'price_per_night', 'main_photo_url')
-    
-    def get_main_photo_url(self, residence):
-        # Get the first photo associated with the residence
-        first_photo = residence.photos.first()
-        if first_photo:
+
+    def get_main_photo_url(self, listing):
+        if listing.cover_photo_url:
             request = self.context.get('request')
             # Build the full URL for the image
-            return request.build_absolute_uri(first_photo.image.url)
+            return request.build_absolute_uri(listing.cover_photo_url)
         return None
 
 
 class PublicResidenceDetailSerializer(serializers.ModelSerializer):
     """
     A detailed serializer for viewing a single public residence.
+    Reads from the denormalized PublicResidenceListing table.
     """
-    # Use the simple owner serializer to show owner's first name
-    owner = PublicOwnerSerializer(read_only=True)
-    # Use the photo serializer to list all photos
-    photos = ResidencePhotoSerializer(many=True, read_only=True)
+    id = serializers.IntegerField(source='residence_id', read_only=True)
+    # Only show the owner's first name
+    owner = serializers.SerializerMethodField()
+    photos = serializers.SerializerMethodField()
+    is_available = serializers.BooleanField(source='is_visible', read_only=True)
 
     class Meta:
-        model = Residence
+        model = PublicResidenceListing
         fields = (
             'id', 'title', 'description', 'address', 'city', 'country',
             'price_per_night', 'is_available', 'conditions', 'owner',
             'photos', 'created_at'
         )
 
+    def get_owner(self, listing):
+        return {'id': listing.owner_id, 'first_name': listing.owner_first_name}
+
+    def get_photos(self, listing):
+        request = self.context.get('request')
+        return [
+            {'id': photo['id'], 'image': request.build_absolute_uri(photo['image'])}
+            for photo in listing.photos
+        ]
+
 
 class BookingSerializer(serializers.ModelSerializer):
     # We make guest and status read-only because they will be set automatically.
@@ -175,7 +184,9 @@ class BookingSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Booking
-        fields = ('id', 'residence', 'residence_title', 'guest', 'check_in_date', 'check_out_date', 'status', 'owner', 'price_per_night')
+        fields = ('id', 'residence', 'residence_title', 'guest', 'check_in_date', 'check_out_date', 'status', 'owner', 'price_per_night', 'total_price')
+        # The total is quoted by the server when the booking is created
+        read_only_fields = ('total_price',)
 
     def validate(self, data):
         """
@@ -217,6 +228,115 @@ class BookingSerializer(serializers.ModelSerializer):
         return data
     
 
+class ArchivedBookingSerializer(serializers.ModelSerializer):
+    """
+    Read-only view of an archived booking, shaped like BookingSerializer.
+    """
+    guest = OwnerContactSerializer(read_only=True)
+    residence_title = serializers.CharField(source='residence.title', read_only=True)
+    owner = OwnerContactSerializer(source='residence.owner', read_only=True)
+
+    class Meta:
+        model = ArchivedBooking
+        fields = (
+            'id', 'residence', 'residence_title', 'guest', 'check_in_date', 'check_out_date',
+            'status', 'owner', 'total_price', 'created_at', 'archived_at'
+        )
+        read_only_fields = fields
+
+
+class BookingHistoryQuerySerializer(serializers.Serializer):
+    """
+    Optional filters of the booking history endpoints, on the check-in date.
+    """
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+
+
+class PricingRuleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PricingRule
+        fields = (
+            'id', 'residence', 'rule_type', 'start_date', 'end_date',
+            'price_per_night', 'min_nights', 'discount_percent'
+        )
+
+    def validate_residence(self, residence):
+        # Owners can only add rules to their own residences
+        request = self.context.get('request')
+        if request and residence.owner_id != request.user.id:
+            raise serializers.ValidationError("You can only add pricing rules to your own residences.")
+        return residence
+
+    def validate(self, data):
+        # The per-type checks live in PricingRule.clean() so the admin applies them too
+        values = {field: getattr(self.instance, field) for field in self.Meta.fields if field != 'id'} if self.instance else {}
+        values.update(data)
+        try:
+            # With its pk, an updated rule isn't mistaken for a second weekend rule
+            PricingRule(pk=getattr(self.instance, 'pk', None), **values).clean()
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError(exc.message_dict)
+        return data
+
+
+class QuoteRequestSerializer(serializers.Serializer):
+    """
+    Validates the query parameters of the quote endpoints.
+    """
+    check_in_date = serializers.DateField()
+    check_out_date = serializers.DateField()
+
+    def validate(self, data):
+        if data['check_in_date'] >= data['check_out_date']:
+            raise serializers.ValidationError("Check-out date must be after check-in date.")
+        return data
+
+
+class BatchQuoteRequestSerializer(QuoteRequestSerializer):
+    ids = serializers.CharField(help_text="Comma separated residence ids")
+
+    MAX_RESIDENCES = 100
+
+    def validate_ids(self, value):
+        try:
+            ids = [int(pk) for pk in value.split(',') if pk]
+        except ValueError:
+            raise serializers.ValidationError("ids must be a comma separated list of residence ids.")
+        if not ids or len(ids) > self.MAX_RESIDENCES:
+            raise serializers.ValidationError(f"Provide between 1 and {self.MAX_RESIDENCES} residence ids.")
+        return ids
+
+
+class QuoteSerializer(serializers.Serializer):
+    residence = serializers.IntegerField()
+    check_in_date = serializers.DateField()
+    check_out_date = serializers.DateField()
+    nights = serializers.IntegerField()
+    subtotal = serializers.DecimalField(max_digits=12, decimal_places=2)
+    discount_percent = serializers.DecimalField(max_digits=5, decimal_places=2)
+    discount = serializers.DecimalField(max_digits=12, decimal_places=2)
+    total = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+class AnalyticsQuerySerializer(serializers.Serializer):
+    """
+    Validates the query parameters of the admin analytics endpoints.
+    """
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    group_by = serializers.ChoiceField(choices=('day', 'city', 'owner'), default='day')
+
+    DEFAULT_DAYS = 30
+
+    def validate(self, data):
+        data.setdefault('end', timezone.now().date())
+        data.setdefault('start', data['end'] - timedelta(days=self.DEFAULT_DAYS - 1))
+        if data['start'] > data['end']:
+            raise serializers.ValidationError("start must be on or before end.")
+        return data
+
+
 class RenterRegistrationSerializer(serializers.ModelSerializer):
     """
     Serializer for the simple registration of a renter/guest.
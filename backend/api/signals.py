@@ -0,0 +1,67 @@
+# backend/api/signals.py
+
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .models import User, OwnerProfile, Residence, ResidencePhoto
+from . import listings, outbox
+
+
+@receiver(pre_save, sender=OwnerProfile)
+def remember_account_status(sender, instance, **kwargs):
+    """
+    Keep the status stored in the database so post_save can tell whether it changed.
+    """
+    instance._previous_account_status = (
+        OwnerProfile.objects.filter(pk=instance.pk).values_list('account_status', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=OwnerProfile)
+def queue_account_approved(sender, instance, created, raw=False, **kwargs):
+    """
+    Queue an approval email when an admin activates an owner account.
+    post_save runs inside the admin's transaction, so the event commits with the change.
+    """
+    if raw:
+        return
+    previous = getattr(instance, '_previous_account_status', None)
+    if instance.account_status == 'active' and previous != 'active':
+        outbox.enqueue_owner_account_approved(instance)
+
+
+# --- Public listing read model (see api/listings.py) ---
+
+@receiver(post_save, sender=Residence)
+def refresh_residence_listing(sender, instance, raw=False, **kwargs):
+    if not raw:
+        listings.refresh_listing(instance.pk)
+
+
+@receiver(post_save, sender=ResidencePhoto)
+@receiver(post_delete, sender=ResidencePhoto)
+def refresh_photo_listing(sender, instance, raw=False, **kwargs):
+    """
+    Deleting a residence cascades to its photos after its listing is already
+    gone, so refreshing here would recreate the listing of a residence that is
+    being deleted. Refresh after commit instead; refresh_listing skips
+    residences that no longer exist.
+    """
+    if not raw:
+        residence_id = instance.residence_id
+        transaction.on_commit(lambda: listings.refresh_listing(residence_id))
+
+
+@receiver(post_save, sender=User)
+def refresh_user_listings(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Logins save last_login only; skip those so they don't rewrite listings
+    if raw or (update_fields is not None and 'first_name' not in update_fields):
+        return
+    listings.refresh_owner_listings(instance.pk)
+
+
+@receiver(post_save, sender=OwnerProfile)
+def refresh_profile_listings(sender, instance, raw=False, **kwargs):
+    if not raw:
+        listings.refresh_owner_listings(instance.user_id)
@@ -0,0 +1,184 @@
+# backend/api/similarity.py
+
+import math
+import re
+import zlib
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Residence, ResidenceNeighbor, RollupState
+
+STATE_NAME = 'similar_residences'
+
+# Every feature is hashed into a fixed-size vector, so a residence's vector only
+# depends on its own fields. That keeps stored neighbors comparable between
+# incremental runs (no vocabulary or corpus statistics to drift).
+TEXT_DIMENSIONS = 512
+CATEGORY_DIMENSIONS = 64
+
+# Relative importance of each feature block in the cosine similarity
+WEIGHTS = {
+    'city': 1.0,
+    'country': 0.3,
+    'price': 0.8,
+    'text': 0.6,
+}
+
+TOKEN_RE = re.compile(r'\w{3,}', re.UNICODE)
+
+
+def bucket(value, dimensions):
+    return zlib.crc32(value.encode('utf-8')) % dimensions
+
+
+def vectorize(residences):
+    """
+    Returns an (n, d) float32 matrix of L2-normalised feature vectors, one row per residence.
+    """
+    size = 2 * CATEGORY_DIMENSIONS + 2 + TEXT_DIMENSIONS
+    matrix = np.zeros((len(residences), size), dtype=np.float32)
+    city_offset, country_offset = 0, CATEGORY_DIMENSIONS
+    price_offset = 2 * CATEGORY_DIMENSIONS
+    text_offset = price_offset + 2
+
+    for row, residence in enumerate(residences):
+        matrix[row, city_offset + bucket(residence.city.strip().lower(), CATEGORY_DIMENSIONS)] = WEIGHTS['city']
+        matrix[row, country_offset + bucket(residence.country.strip().lower(), CATEGORY_DIMENSIONS)] = WEIGHTS['country']
+
+        # Price band as an angle: nearby log-prices point in nearby directions
+        angle = math.log10(max(float(residence.price_per_night), 1.0)) / 7 * (math.pi / 2)
+        matrix[row, price_offset] = WEIGHTS['price'] * math.cos(angle)
+        matrix[row, price_offset + 1] = WEIGHTS['price'] * math.sin(angle)
+
+        tokens = TOKEN_RE.findall(f"{residence.title} {residence.description}".lower())
+        if tokens:
+            text = np.bincount([bucket(token, TEXT_DIMENSIONS) for token in tokens], minlength=TEXT_DIMENSIONS)
+            text = np.log1p(text)
+            matrix[row, text_offset:] = WEIGHTS['text'] * text / np.linalg.norm(text)
+
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def top_k(scores, k):
+    """
+    Returns the column indexes of the k best scores of each row, best first.
+    """
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64)
+    best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.take_along_axis(scores, best, axis=1).argsort(axis=1)[:, ::-1]
+    return np.take_along_axis(best, order, axis=1)
+
+
+def neighbors_for_rows(matrix, rows, k, block_size):
+    """
+    Computes the top-k neighbors of the given rows against every row of the
+    matrix, `block_size` rows at a time to bound memory to block_size * n scores.
+    Yields (row, [(column, score), ...]).
+    """
+    # The row itself is masked out, so only n - 1 columns are real candidates
+    k = min(k, matrix.shape[0] - 1)
+    for start in range(0, len(rows), block_size):
+        block = rows[start:start + block_size]
+        scores = matrix[block] @ matrix.T
+        scores[np.arange(len(block)), block] = -np.inf  # A residence is not its own neighbor
+        for position, columns in enumerate(top_k(scores, k)):
+            yield block[position], [
+                (column, float(scores[position, column])) for column in columns
+                if np.isfinite(scores[position, column])
+            ]
+
+
+def active_residences():
+    return list(
+        Residence.objects.filter(listing__is_visible=True)
+        .only('id', 'title', 'description', 'city', 'country', 'price_per_night', 'updated_at')
+        .order_by('pk')
+    )
+
+
+def rebuild_neighbors(k=10, block_size=256, full=False):
+    """
+    Refreshes the ResidenceNeighbor table and returns the number of residences
+    whose neighbor lists were rewritten.
+
+    A run only recomputes residences that changed since the last run, plus the
+    ones whose stored neighbors changed, disappeared or are incomplete. For every
+    other residence, the changed residences are scored against it and merged
+    into its existing list.
+    """
+    started = timezone.now()
+    state, _ = RollupState.objects.get_or_create(name=STATE_NAME)
+
+    residences = active_residences()
+    ids = [residence.id for residence in residences]
+    index = {residence_id: row for row, residence_id in enumerate(ids)}
+    matrix = vectorize(residences)
+    expected = min(k, len(residences) - 1)
+
+    stored = {}
+    if not full:
+        for residence_id, neighbor_id, score in (
+            ResidenceNeighbor.objects.order_by('residence', 'rank').values_list('residence', 'neighbor', 'score')
+        ):
+            stored.setdefault(residence_id, []).append((neighbor_id, score))
+
+    if full or state.last_run_at is None:
+        changed = set(index)
+    else:
+        changed = {r.id for r in residences if r.updated_at >= state.last_run_at}
+        # Residences that just became visible (e.g. their owner was approved)
+        changed |= {residence_id for residence_id in index if residence_id not in stored}
+
+    # Residences whose list can't be patched by merging: they changed themselves,
+    # or one of their stored neighbors changed, is no longer active or was deleted
+    # (or is the residence itself, which older runs stored for small catalogues).
+    recompute = set(changed)
+    for residence_id in index:
+        neighbors = stored.get(residence_id, [])
+        if len(neighbors) < expected or any(
+            n not in index or n in changed or n == residence_id for n, _ in neighbors
+        ):
+            recompute.add(residence_id)
+
+    results = {}
+    recompute_rows = np.array(sorted(index[r] for r in recompute), dtype=np.int64)
+    for row, neighbors in neighbors_for_rows(matrix, recompute_rows, k, block_size):
+        results[ids[row]] = [(ids[column], score) for column, score in neighbors]
+
+    # Merge the changed residences into the lists of everyone else
+    changed_rows = np.array(sorted(index[r] for r in changed), dtype=np.int64)
+    merge_rows = np.array(sorted(index[r] for r in set(index) - recompute), dtype=np.int64)
+    if len(changed_rows) and len(merge_rows):
+        for start in range(0, len(merge_rows), block_size):
+            block = merge_rows[start:start + block_size]
+            scores = matrix[block] @ matrix[changed_rows].T
+            for position, row in enumerate(block):
+                residence_id = ids[row]
+                candidates = stored[residence_id] + [
+                    (ids[column], float(score)) for column, score in zip(changed_rows, scores[position])
+                ]
+                merged = sorted(candidates, key=lambda item: item[1], reverse=True)[:k]
+                if merged != stored[residence_id]:
+                    results[residence_id] = merged
+
+    with transaction.atomic():
+        # Drop the lists of residences that are no longer active
+        ResidenceNeighbor.objects.exclude(residence__in=index.keys()).delete()
+        ResidenceNeighbor.objects.filter(residence__in=results.keys()).delete()
+        ResidenceNeighbor.objects.bulk_create(
+            [
+                ResidenceNeighbor(residence_id=residence_id, neighbor_id=neighbor_id, rank=rank, score=score)
+                for residence_id, neighbors in results.items()
+                for rank, (neighbor_id, score) in enumerate(neighbors)
+            ],
+            batch_size=1000,
+        )
+        state.last_run_at = started
+        state.save(update_fields=['last_run_at'])
+
+    return len(results)
@@ -0,0 +1,36 @@
+# backend/api/storage.py
+
+from django.conf import settings
+from django.core import signing
+from django.core.files.storage import FileSystemStorage, storages
+from django.urls import reverse
+
+SIGNING_SALT = 'api.private-document'
+
+
+class PrivateDocumentStorage(FileSystemStorage):
+    """
+    Stores identity documents outside of MEDIA_ROOT, where nothing serves them
+    directly. `url()` returns a short-lived signed link to PrivateDocumentView.
+    """
+
+    def __init__(self, location=None, **kwargs):
+        super().__init__(location=location or settings.PRIVATE_MEDIA_ROOT, base_url=None, **kwargs)
+
+    def url(self, name):
+        token = signing.dumps(name, salt=SIGNING_SALT)
+        return reverse('private-document', kwargs={'token': token})
+
+
+def get_private_storage():
+    # A callable, so the storage is picked from settings at runtime rather than
+    # frozen into migrations.
+    return storages['private']
+
+
+def load_document_name(token):
+    """
+    Returns the file name signed into `token`, or raises signing.BadSignature
+    (signing.SignatureExpired when the link is too old).
+    """
+    return signing.loads(token, salt=SIGNING_SALT, max_age=settings.PRIVATE_DOCUMENT_URL_MAX_AGE)
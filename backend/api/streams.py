@@ -0,0 +1,322 @@
+# backend/api/streams.py
+
+import asyncio
+import json
+import logging
+from datetime import timedelta
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, AuthenticationFailed
+
+from .models import BookingNotification
+
+logger = logging.getLogger(__name__)
+
+OWNER_BOOKING_STREAM_PATH = '/api/owner/bookings/stream/'
+BACKLOG_BATCH_SIZE = 500
+
+
+def late_commit_cutoff():
+    return timezone.now() - timedelta(seconds=settings.BOOKING_STREAM['LATE_COMMIT_WINDOW'])
+
+
+class RecentIds:
+    """
+    Ids of the notifications already handled, kept for twice the late-commit
+    window: re-reading the window returns them again and they must be dropped.
+    """
+
+    def __init__(self):
+        self.created_at = {}  # id -> created_at, roughly in id order
+
+    def __contains__(self, notification_id):
+        return notification_id in self.created_at
+
+    def add(self, notification):
+        """
+        Records a notification and returns False if it was already recorded.
+        """
+        if notification.id in self.created_at:
+            return False
+        self.created_at[notification.id] = notification.created_at
+
+        cutoff = timezone.now() - 2 * timedelta(seconds=settings.BOOKING_STREAM['LATE_COMMIT_WINDOW'])
+        while self.created_at:
+            oldest = next(iter(self.created_at))
+            if self.created_at[oldest] >= cutoff:
+                break
+            del self.created_at[oldest]
+        return True
+
+
+class NotificationBroadcaster:
+    """
+    In-process fan-out of BookingNotification rows.
+
+    A single polling task per process reads new rows from the database and
+    hands them to the queues of the owners connected to this process, so the
+    database sees one query per interval however many streams are open.
+
+    Ids are assigned on insert but become visible on commit, so a row can show
+    up after rows with higher ids were already polled. Each poll therefore also
+    re-reads the rows created during the last LATE_COMMIT_WINDOW seconds and
+    pushes the ones it hasn't seen yet.
+    """
+
+    def __init__(self):
+        self.subscribers = {}  # owner id -> set of asyncio.Queue
+        self.cursor = None
+        self.seen = RecentIds()
+        self.task = None
+
+    def subscribe(self, owner_id):
+        queue = asyncio.Queue(maxsize=settings.BOOKING_STREAM['QUEUE_SIZE'])
+        self.subscribers.setdefault(owner_id, set()).add(queue)
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self.poll())
+        return queue
+
+    def unsubscribe(self, owner_id, queue):
+        queues = self.subscribers.get(owner_id, set())
+        queues.discard(queue)
+        if not queues:
+            self.subscribers.pop(owner_id, None)
+
+    async def poll(self):
+        if self.cursor is None:
+            self.cursor = await database_sync_to_async(latest_notification_id)()
+
+        # Stop when the last stream closes; the next subscriber restarts the task
+        while self.subscribers:
+            await self.poll_once()
+            await asyncio.sleep(settings.BOOKING_STREAM['POLL_INTERVAL'])
+
+        # Start from the newest row again next time, rather than replaying the
+        # events created while nobody was listening
+        self.cursor = None
+
+    async def poll_once(self):
+        try:
+            notifications = await database_sync_to_async(poll_notifications)(
+                self.cursor, late_commit_cutoff(), self.seen,
+            )
+        except Exception:
+            logger.exception("booking_stream.poll_failed")
+            return
+
+        for notification in notifications:
+            if not self.seen.add(notification):
+                continue
+            self.cursor = max(self.cursor, notification.id)
+            for queue in list(self.subscribers.get(notification.owner_id, ())):
+                try:
+                    queue.put_nowait(notification)
+                except asyncio.QueueFull:
+                    # Drop the backlog of a client that can't keep up and tell it to
+                    # close; it reconnects and resumes from its Last-Event-ID
+                    while not queue.empty():
+                        queue.get_nowait()
+                    queue.put_nowait(None)
+
+
+broadcaster = NotificationBroadcaster()
+
+
+# --- Database access ---
+
+def database_sync_to_async(func):
+    """
+    sync_to_async for code that runs outside Django's request cycle. Like the
+    request cycle (and Channels' helper of the same name), it drops connections
+    that are broken or older than CONN_MAX_AGE before and after each call, so
+    the stream recovers when the database closes an idle connection.
+    """
+    def call(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return sync_to_async(call)
+
+
+def latest_notification_id():
+    return BookingNotification.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+
+def notifications_after(cursor, owner_id=None, limit=BACKLOG_BATCH_SIZE):
+    queryset = BookingNotification.objects.filter(id__gt=cursor)
+    if owner_id is not None:
+        queryset = queryset.filter(owner_id=owner_id)
+    return list(queryset.order_by('id')[:limit])
+
+
+def late_notifications(cursor, since, known, owner_id=None):
+    """
+    Rows at or below `cursor` created after `since` that are not in `known`:
+    the ones that committed after the cursor had already moved past their id.
+    """
+    queryset = BookingNotification.objects.filter(id__lte=cursor, created_at__gte=since)
+    if owner_id is not None:
+        queryset = queryset.filter(owner_id=owner_id)
+    # Only ids first: nearly all of them are already known
+    ids = [notification_id for notification_id in queryset.values_list('id', flat=True) if notification_id not in known]
+    return list(BookingNotification.objects.filter(id__in=ids).order_by('id')) if ids else []
+
+
+def poll_notifications(cursor, since, known):
+    return late_notifications(cursor, since, known) + notifications_after(cursor)
+
+
+def authenticate(token):
+    """
+    Returns the user for a JWT access token, or None. EventSource can't set
+    headers, so the token may also come from the `token` query parameter.
+    """
+    if not token:
+        return None
+    auth = JWTAuthentication()
+    try:
+        return auth.get_user(auth.get_validated_token(token))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+# --- SSE ---
+
+def format_event(notification):
+    data = json.dumps(notification.payload)
+    return f"id: {notification.id}\nevent: {notification.event_type}\ndata: {data}\n\n".encode()
+
+
+async def send_error(send, status, message):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json')],
+    })
+    await send({'type': 'http.response.body', 'body': json.dumps({'detail': message}).encode()})
+
+
+def cors_headers(headers):
+    origin = headers.get(b'origin', b'').decode()
+    if origin and origin in settings.CORS_ALLOWED_ORIGINS:
+        return [(b'access-control-allow-origin', origin.encode()), (b'vary', b'Origin')]
+    return []
+
+
+async def owner_booking_stream(scope, receive, send):
+    """
+    ASGI endpoint streaming the authenticated owner's booking events as
+    server-sent events. Clients that reconnect with a Last-Event-ID header (or
+    `last_event_id` parameter) first receive the events they missed.
+
+    Delivery is at least once: a reconnecting client is sent again the events of
+    the last LATE_COMMIT_WINDOW seconds (so it can't miss one that committed
+    late), so clients should ignore event ids they have already handled.
+    """
+    headers = dict(scope['headers'])
+    query = parse_qs(scope.get('query_string', b'').decode())
+
+    token = query.get('token', [None])[0]
+    authorization = headers.get(b'authorization', b'').decode()
+    if authorization.startswith('Bearer '):
+        token = authorization[len('Bearer '):]
+
+    user = await database_sync_to_async(authenticate)(token)
+    if user is None:
+        await send_error(send, 401, 'Authentication credentials were not provided or are invalid.')
+        return
+
+    last_event_id = headers.get(b'last-event-id', b'').decode() or query.get('last_event_id', [''])[0]
+    last_event_id = int(last_event_id) if last_event_id.isdigit() else None
+
+    # Subscribe before reading the backlog so nothing falls in between;
+    # `sent` drops events that show up in both.
+    queue = broadcaster.subscribe(user.id)
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                # Tell nginx-style proxies not to buffer the stream
+                (b'x-accel-buffering', b'no'),
+                *cors_headers(headers),
+            ],
+        })
+        await send({
+            'type': 'http.response.body',
+            'body': f"retry: {settings.BOOKING_STREAM['RETRY_MS']}\n\n".encode(),
+            'more_body': True,
+        })
+
+        sent = RecentIds()
+        if last_event_id is not None:
+            backlog = await database_sync_to_async(late_notifications)(
+                last_event_id, late_commit_cutoff(), sent, user.id,
+            )
+            cursor = last_event_id
+            while True:
+                for notification in backlog:
+                    if sent.add(notification):
+                        await send({'type': 'http.response.body', 'body': format_event(notification), 'more_body': True})
+                    cursor = max(cursor, notification.id)
+                backlog = await database_sync_to_async(notifications_after)(cursor, user.id)
+                if not backlog:
+                    break
+
+        disconnected = asyncio.ensure_future(wait_for_disconnect(receive))
+        try:
+            while not disconnected.done():
+                next_event = asyncio.ensure_future(queue.get())
+                done, _ = await asyncio.wait(
+                    {next_event, disconnected},
+                    timeout=settings.BOOKING_STREAM['HEARTBEAT_INTERVAL'],
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if next_event not in done:
+                    next_event.cancel()
+                    if not disconnected.done():
+                        # Comment line that keeps proxies from closing an idle connection
+                        await send({'type': 'http.response.body', 'body': b': keep-alive\n\n', 'more_body': True})
+                    continue
+
+                notification = next_event.result()
+                if notification is None:
+                    break  # Fell too far behind; the client resumes from its last id
+                if sent.add(notification):
+                    await send({'type': 'http.response.body', 'body': format_event(notification), 'more_body': True})
+        finally:
+            disconnected.cancel()
+
+        await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        broadcaster.unsubscribe(user.id, queue)
+
+
+async def wait_for_disconnect(receive):
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return
+
+
+def with_booking_stream(django_application):
+    """
+    Wraps the Django ASGI application so the owner booking stream is served by
+    the long-lived handler above and everything else goes to Django.
+    """
+    async def application(scope, receive, send):
+        if scope['type'] == 'http' and scope['path'] == OWNER_BOOKING_STREAM_PATH:
+            await owner_booking_stream(scope, receive, send)
+        else:
+            await django_application(scope, receive, send)
+
+    return application
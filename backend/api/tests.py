@@ -1,3 +1,561 @@
-from django.test import TestCase
+# backend/api/tests.py
 
-# Create your tests here.
+import asyncio
+import io
+import math
+from unittest import mock
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core import mail
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.db.models import Prefetch, QuerySet
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .models import (
+    User, OwnerProfile, Residence, ResidencePhoto, PricingRule, PublicResidenceListing, ResidenceNeighbor,
+    Booking, BookingNotification, ArchivedBooking, IdempotencyKey, OutboxEvent,
+)
+from . import outbox
+from .documents import parse_range
+from .pricing import count_weekend_nights, quote
+from .similarity import rebuild_neighbors
+from .streams import NotificationBroadcaster, broadcaster, owner_booking_stream
+from .throttling import AnonTokenBucketThrottle, TokenBucketThrottle
+from .warmup import warm_up
+
+
+def create_owner(email='owner@example.com', **profile):
+    owner = User.objects.create_user(
+        username=email, email=email, password='password', first_name='Owner', last_name='Test',
+    )
+    OwnerProfile.objects.create(
+        user=owner, address='1 Main Street', phone_number='0102030405',
+        id_front_photo='id_documents/front.jpg', id_back_photo='id_documents/back.jpg',
+        account_status=profile.pop('account_status', 'active'), **profile,
+    )
+    return owner
+
+
+def create_residence(owner, **fields):
+    values = {
+        'title': 'Villa', 'description': 'A quiet villa', 'address': '2 Beach Road',
+        'city': 'Abidjan', 'country': "Côte d'Ivoire", 'price_per_night': Decimal('100.00'),
+    }
+    values.update(fields)
+    return Residence.objects.create(owner=owner, **values)
+
+
+class CacheClearingTestCase(TestCase):
+    """
+    Throttle buckets are kept in the cache, which outlives a test's database
+    transaction: start every test with empty buckets.
+    """
+
+    def setUp(self):
+        cache.clear()
+
+
+class PublicListingTests(CacheClearingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner = create_owner()
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def test_delete_residence_with_photos(self):
+        residence = create_residence(self.owner)
+        with self.captureOnCommitCallbacks(execute=True):
+            ResidencePhoto.objects.create(residence=residence, image='residence_photos/a.jpg')
+            ResidencePhoto.objects.create(residence=residence, image='residence_photos/b.jpg')
+        self.assertEqual(PublicResidenceListing.objects.get(pk=residence.pk).photo_count, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(f'/api/residences/{residence.pk}/')
+
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(PublicResidenceListing.objects.filter(pk=residence.pk).exists())
+        # A listing recreated for the deleted residence would only fail the FK check at commit
+        connection.check_constraints()
+
+
+class SimilarResidenceTests(CacheClearingTestCase):
+    def setUp(self):
+        super().setUp()
+        owner = create_owner()
+        self.residences = [
+            create_residence(owner, title='Villa by the sea', price_per_night='100.00'),
+            create_residence(owner, title='Villa near the sea', price_per_night='120.00'),
+            create_residence(owner, title='Studio downtown', city='Bouaké', price_per_night='30.00'),
+        ]
+
+    def test_fewer_residences_than_k(self):
+        self.assertEqual(rebuild_neighbors(k=10), 3)
+
+        for residence in self.residences:
+            neighbors = list(ResidenceNeighbor.objects.filter(residence=residence).order_by('rank'))
+            self.assertEqual(len(neighbors), 2)
+            self.assertNotIn(residence.pk, [n.neighbor_id for n in neighbors])
+            self.assertTrue(all(math.isfinite(n.score) for n in neighbors))
+
+        response = APIClient().get(f'/api/residences/public/{self.residences[0].pk}/similar/')
+        self.assertEqual([item['id'] for item in response.data], [self.residences[1].pk, self.residences[2].pk])
+
+    def test_incremental_run_merges_new_residence(self):
+        rebuild_neighbors(k=10)
+        new = create_residence(self.residences[0].owner, title='Villa facing the sea', price_per_night='110.00')
+
+        rebuild_neighbors(k=10)
+
+        for residence in self.residences:
+            neighbors = ResidenceNeighbor.objects.filter(residence=residence).values_list('neighbor', flat=True)
+            self.assertIn(new.pk, neighbors)
+            self.assertEqual(len(neighbors), 3)
+
+
+class PricingTests(CacheClearingTestCase):
+    # 2027-01-01 is a Friday
+    def setUp(self):
+        super().setUp()
+        self.owner = create_owner()
+        self.residence = create_residence(self.owner, price_per_night=Decimal('100.00'))
+
+    def add_rule(self, rule_type, **fields):
+        return PricingRule.objects.create(residence=self.residence, rule_type=rule_type, **fields)
+
+    def test_count_weekend_nights(self):
+        start = date(2027, 1, 1)
+        for offset in range(7):
+            for nights in range(30):
+                check_in = start + timedelta(days=offset)
+                check_out = check_in + timedelta(days=nights)
+                expected = sum(
+                    1 for day in range(nights) if (check_in + timedelta(days=day)).weekday() in (4, 5)
+                )
+                self.assertEqual(count_weekend_nights(check_in, check_out), expected)
+
+    def test_base_price(self):
+        result = quote(self.residence, date(2027, 1, 4), date(2027, 1, 7))
+        self.assertEqual(result['nights'], 3)
+        self.assertEqual(result['total'], Decimal('300.00'))
+
+    def test_weekend_price(self):
+        self.add_rule('weekend', price_per_night=Decimal('150.00'))
+        # Two weeks from Monday: 4 weekend nights
+        result = quote(self.residence, date(2027, 1, 4), date(2027, 1, 18))
+        self.assertEqual(result['total'], Decimal('1600.00'))
+
+    def test_season_price(self):
+        self.add_rule('season', start_date=date(2027, 1, 10), end_date=date(2027, 1, 15), price_per_night=Decimal('200.00'))
+        # 2 nights before, 5 in and 2 after the season
+        result = quote(self.residence, date(2027, 1, 8), date(2027, 1, 17))
+        self.assertEqual(result['total'], Decimal('1400.00'))
+
+    def test_season_overrides_weekend_price(self):
+        self.add_rule('weekend', price_per_night=Decimal('150.00'))
+        self.add_rule('season', start_date=date(2027, 1, 10), end_date=date(2027, 1, 15), price_per_night=Decimal('200.00'))
+        # Weekend nights on Jan 8, 9, 15 and 16 are outside the season
+        result = quote(self.residence, date(2027, 1, 8), date(2027, 1, 17))
+        self.assertEqual(result['total'], Decimal('1600.00'))
+
+    def test_overlapping_seasons_latest_start_wins(self):
+        self.add_rule('season', start_date=date(2027, 1, 1), end_date=date(2027, 2, 1), price_per_night=Decimal('200.00'))
+        self.add_rule('season', start_date=date(2027, 1, 10), end_date=date(2027, 1, 12), price_per_night=Decimal('300.00'))
+        result = quote(self.residence, date(2027, 1, 8), date(2027, 1, 13))
+        self.assertEqual(result['total'], Decimal('200.00') * 3 + Decimal('300.00') * 2)
+
+    def test_largest_reached_discount_applies(self):
+        self.add_rule('length_of_stay', min_nights=3, discount_percent=Decimal('5.00'))
+        self.add_rule('length_of_stay', min_nights=7, discount_percent=Decimal('10.00'))
+        self.add_rule('length_of_stay', min_nights=30, discount_percent=Decimal('20.00'))
+        result = quote(self.residence, date(2027, 1, 4), date(2027, 1, 13))
+        self.assertEqual(result['subtotal'], Decimal('900.00'))
+        self.assertEqual(result['discount_percent'], Decimal('10.00'))
+        self.assertEqual(result['discount'], Decimal('90.00'))
+        self.assertEqual(result['total'], Decimal('810.00'))
+
+    def test_incomplete_rules_are_rejected_and_ignored(self):
+        incomplete = [
+            PricingRule(residence=self.residence, rule_type='length_of_stay', discount_percent=Decimal('10.00')),
+            PricingRule(residence=self.residence, rule_type='season', price_per_night=Decimal('200.00')),
+        ]
+        for rule in incomplete:
+            with self.assertRaises(ValidationError):
+                rule.full_clean()
+            rule.save()
+
+        result = quote(self.residence, date(2027, 1, 4), date(2027, 1, 7))
+        self.assertEqual(result['total'], Decimal('300.00'))
+
+    def test_one_weekend_rule_per_residence(self):
+        rule = self.add_rule('weekend', price_per_night=Decimal('150.00'))
+        rule.full_clean()
+        with self.assertRaises(ValidationError):
+            PricingRule(residence=self.residence, rule_type='weekend', price_per_night=Decimal('120.00')).full_clean()
+
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        response = client.patch(f'/api/pricing-rules/{rule.pk}/', {'price_per_night': '160.00'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_newest_weekend_rule_wins(self):
+        # Saved without clean(): the price must not depend on the order the rules are loaded in
+        self.add_rule('weekend', price_per_night=Decimal('150.00'))
+        self.add_rule('weekend', price_per_night=Decimal('120.00'))
+        for ordering in ('id', '-id'):
+            residence = Residence.objects.prefetch_related(
+                Prefetch('pricing_rules', queryset=PricingRule.objects.order_by(ordering))
+            ).get(pk=self.residence.pk)
+            # Friday and Saturday nights
+            result = quote(residence, date(2027, 1, 1), date(2027, 1, 3))
+            self.assertEqual(result['total'], Decimal('240.00'))
+
+    def test_pricing_rule_api_validation(self):
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        response = client.post('/api/pricing-rules/', {
+            'residence': self.residence.pk, 'rule_type': 'season', 'price_per_night': '200.00',
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('start_date', response.data)
+
+
+class BookingNotificationTests(CacheClearingTestCase):
+    def test_purge_keeps_recent_notifications(self):
+        owner = create_owner()
+        old = BookingNotification.objects.create(owner=owner, event_type='booking.created')
+        recent = BookingNotification.objects.create(owner=owner, event_type='booking.created')
+        BookingNotification.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=2))
+
+        call_command('purge_booking_notifications', hours=24, stdout=io.StringIO())
+
+        self.assertEqual(list(BookingNotification.objects.values_list('pk', flat=True)), [recent.pk])
+
+    def test_expiry_notifies_only_bookings_it_cancelled(self):
+        owner = create_owner()
+        residence = create_residence(owner)
+        guest = User.objects.create_user(username='guest', email='guest@example.com', password='password')
+        stale, confirmed_meanwhile = [
+            Booking.objects.create(
+                residence=residence, guest=guest, status='pending',
+                check_in_date=date(2027, 1, day), check_out_date=date(2027, 1, day + 2),
+            )
+            for day in (4, 10)
+        ]
+        Booking.objects.update(created_at=timezone.now() - timedelta(days=2))
+
+        # The owner confirms one of the bookings after the sweeper selected it
+        update = QuerySet.update
+        def confirm_first(queryset, **values):
+            if values.get('status') == 'cancelled':
+                update(Booking.objects.filter(pk=confirmed_meanwhile.pk), status='confirmed')
+            return update(queryset, **values)
+
+        with mock.patch.object(QuerySet, 'update', autospec=True, side_effect=confirm_first):
+            call_command('expire_pending_bookings', hours=24, stdout=io.StringIO())
+
+        notified = BookingNotification.objects.filter(event_type='booking.status_changed')
+        self.assertEqual([n.payload['id'] for n in notified], [stale.pk])
+        self.assertEqual(Booking.objects.get(pk=confirmed_meanwhile.pk).status, 'confirmed')
+
+
+class BookingHistoryTests(CacheClearingTestCase):
+    def test_history_is_cursor_paginated(self):
+        owner = create_owner()
+        residence = create_residence(owner)
+        other_residence = create_residence(create_owner('other@example.com'))
+        guest = User.objects.create_user(username='guest', email='guest@example.com', password='password')
+        created_at = timezone.now() - timedelta(days=400)
+        for pk in range(1, 6):
+            ArchivedBooking.objects.create(
+                id=pk, guest=guest, residence=residence if pk != 3 else other_residence,
+                check_in_date=date(2025, 1, pk), check_out_date=date(2025, 1, pk + 1), status='confirmed',
+                # Two bookings share a timestamp so the id breaks the tie
+                created_at=created_at + timedelta(days=min(pk, 4)), updated_at=created_at,
+            )
+
+        client = APIClient()
+        client.force_authenticate(owner)
+        ids = []
+        url = '/api/owner/bookings/history/?page_size=2'
+        while url:
+            response = client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['results']), 2)
+            ids += [booking['id'] for booking in response.data['results']]
+            url = response.data['next']
+
+        self.assertEqual(ids, [5, 4, 2, 1])
+
+
+class IdempotencyTests(CacheClearingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.residence = create_residence(create_owner())
+        self.guest = User.objects.create_user(username='guest', email='guest@example.com', password='password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.guest)
+        self.booking = {
+            'residence': self.residence.pk, 'check_in_date': '2027-01-04', 'check_out_date': '2027-01-07',
+            'status': 'pending',
+        }
+
+    def post(self, data, key):
+        return self.client.post('/api/bookings/create/', data, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_first_response(self):
+        first = self.post(self.booking, 'key-1')
+        retry = self.post(self.booking, 'key-1')
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_requests_without_key_are_not_deduplicated(self):
+        self.client.post('/api/bookings/create/', self.booking, format='json')
+        self.client.post('/api/bookings/create/', self.booking, format='json')
+        self.assertEqual(Booking.objects.count(), 2)
+
+    def test_key_reused_for_different_request(self):
+        self.post(self.booking, 'key-1')
+        response = self.post(dict(self.booking, check_out_date='2027-01-08'), 'key-1')
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_keys_are_scoped_to_the_user(self):
+        self.post(self.booking, 'key-1')
+        other = User.objects.create_user(username='other', email='other@example.com', password='password')
+        self.client.force_authenticate(other)
+
+        self.assertEqual(self.post(self.booking, 'key-1').status_code, 201)
+        self.assertEqual(Booking.objects.count(), 2)
+
+    def test_failed_request_releases_key(self):
+        invalid = self.post({'residence': self.residence.pk}, 'key-1')
+        self.assertEqual(invalid.status_code, 400)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+        response = self.post(self.booking, 'key-1')
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn('Idempotent-Replayed', response)
+
+    @override_settings(IDEMPOTENCY={'TTL_HOURS': 24, 'WAIT_TIMEOUT': 0.2, 'POLL_INTERVAL': 0.05, 'LOCK_TIMEOUT': 60})
+    def test_duplicate_of_in_flight_request_waits(self):
+        self.post(self.booking, 'key-1')
+        IdempotencyKey.objects.update(status='in_progress', response_status=None, response_body=None)
+
+        response = self.post(self.booking, 'key-1')
+
+        self.assertEqual(response.status_code, 409)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_abandoned_key_is_taken_over(self):
+        self.post(self.booking, 'key-1')
+        IdempotencyKey.objects.update(status='in_progress', created_at=timezone.now() - timedelta(hours=1))
+
+        response = self.post(self.booking, 'key-1')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(IdempotencyKey.objects.get().status, 'completed')
+
+    def test_expired_keys_are_purged(self):
+        self.post(self.booking, 'key-1')
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        call_command('purge_idempotency_keys', stdout=io.StringIO())
+
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+
+class TokenBucketThrottleTests(CacheClearingTestCase):
+    class Throttle(AnonTokenBucketThrottle):
+        rate = '3/min'
+        now = 1000.0
+
+        def timer(self):
+            return self.now
+
+    def setUp(self):
+        super().setUp()
+        self.request = Request(APIRequestFactory().get('/', REMOTE_ADDR='10.0.0.1'))
+        self.request.user = AnonymousUser()
+
+    def allow(self, now):
+        throttle = self.Throttle()
+        throttle.now = now
+        return throttle.allow_request(self.request, None), throttle.wait()
+
+    def test_burst_up_to_capacity_then_refill(self):
+        self.assertEqual([self.allow(1000.0)[0] for _ in range(3)], [True, True, True])
+
+        allowed, wait = self.allow(1000.0)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(wait, 20.0)  # One token every 60s / 3
+
+        self.assertFalse(self.allow(1010.0)[0])
+        self.assertTrue(self.allow(1020.0)[0])
+        self.assertFalse(self.allow(1020.0)[0])
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://localhost:6379/0',
+    }})
+    def test_redis_buckets_are_updated_by_script(self):
+        script = mock.Mock(side_effect=[[1, '2'], [0, '0.25']])
+        client = mock.Mock(**{'register_script.return_value': script})
+        self.addCleanup(setattr, TokenBucketThrottle, 'take_token_script', None)
+
+        with mock.patch('django.core.cache.backends.redis.RedisCacheClient.get_client', return_value=client):
+            self.assertEqual(self.allow(1000.0), (True, None))
+            allowed, wait = self.allow(1000.0)
+
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(wait, 15.0)
+        self.assertEqual(script.call_args.kwargs['args'], [3, 3 / 60, 1000.0, 60])
+        client.register_script.assert_called_once()
+
+    def test_bucket_never_exceeds_capacity(self):
+        self.allow(1000.0)
+        # A long idle period refills the bucket to 3 tokens, not more
+        self.assertEqual([self.allow(5000.0)[0] for _ in range(4)], [True, True, True, False])
+
+
+class RangeHeaderTests(CacheClearingTestCase):
+    def test_parse_range(self):
+        cases = {
+            None: None,
+            'bytes=0-99': (0, 99),
+            'bytes=100-': (100, 999),
+            'bytes=900-5000': (900, 999),
+            'bytes=-100': (900, 999),
+            'bytes=-5000': (0, 999),
+            'bytes=1000-': 'unsatisfiable',
+            'bytes=50-10': 'unsatisfiable',
+            'bytes=-': None,
+            'bytes=0-1,5-9': None,  # Multiple ranges are served as the whole file
+            'items=0-9': None,
+        }
+        for header, expected in cases.items():
+            with self.subTest(header=header):
+                self.assertEqual(parse_range(header, 1000), expected)
+
+
+@override_settings(OUTBOX_WEBHOOK_URLS=['https://hooks.example.com/a', 'https://hooks.example.com/b'])
+class OutboxTests(CacheClearingTestCase):
+    def setUp(self):
+        super().setUp()
+        # Creating an active owner queues its account approval event
+        create_owner()
+        self.event = OutboxEvent.objects.get(event_type=outbox.OWNER_ACCOUNT_APPROVED)
+
+    def dispatch(self):
+        OutboxEvent.objects.update(next_attempt_at=timezone.now())
+        return outbox.dispatch_batch(10)
+
+    def test_retries_skip_delivered_channels(self):
+        failing = mock.Mock(side_effect=[mock.Mock(), Exception('down'), mock.Mock()])
+        with mock.patch('requests.post', failing):
+            self.assertEqual(self.dispatch(), (0, 1, 0))
+            self.assertEqual(self.dispatch(), (1, 0, 0))
+
+        # One email, and the webhook that succeeded first was not called again
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(
+            [c.args[0] for c in failing.call_args_list],
+            ['https://hooks.example.com/a', 'https://hooks.example.com/b', 'https://hooks.example.com/b'],
+        )
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.status, 'sent')
+        self.assertEqual(self.event.attempts, 2)
+
+    @override_settings(OUTBOX_MAX_ATTEMPTS=2)
+    def test_claims_count_as_attempts(self):
+        # Claimed twice by dispatchers that died before recording a result
+        for _ in range(2):
+            OutboxEvent.objects.update(next_attempt_at=timezone.now())
+            outbox.claim_batch(10)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.attempts, 2)
+
+        with mock.patch('requests.post') as post:
+            self.assertEqual(self.dispatch(), (0, 0, 1))
+        post.assert_not_called()
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.status, 'failed')
+
+
+class WarmUpTests(CacheClearingTestCase):
+    def test_unreachable_database_does_not_fail_start_up(self):
+        with mock.patch.object(connection, 'ensure_connection', side_effect=OperationalError('unreachable')), \
+                self.assertLogs('api.warmup', level='WARNING') as logs:
+            warm_up()
+
+        self.assertIn('step=connect:default', logs.output[0])
+
+
+class BookingStreamTests(CacheClearingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner = create_owner()
+        # Closing connections would end the test case's transaction
+        patcher = mock.patch('api.streams.close_old_connections')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def notify(self):
+        return BookingNotification.objects.create(owner=self.owner, event_type='booking.created')
+
+    def test_late_commit_is_broadcast(self):
+        lower, higher = self.notify(), self.notify()
+
+        async def scenario():
+            stream = NotificationBroadcaster()
+            queue = asyncio.Queue()
+            stream.subscribers[self.owner.id] = {queue}
+            # The previous poll saw `higher` before `lower` was committed
+            stream.cursor = higher.id
+            stream.seen.add(higher)
+
+            await stream.poll_once()
+            await stream.poll_once()
+            return [queue.get_nowait().id for _ in range(queue.qsize())]
+
+        self.assertEqual(async_to_sync(scenario)(), [lower.id])
+
+    def test_resume_includes_late_commit(self):
+        lower, higher, newer = self.notify(), self.notify(), self.notify()
+        token = str(AccessToken.for_user(self.owner))
+        scope = {
+            'type': 'http', 'path': '/api/owner/bookings/stream/', 'headers': [],
+            'query_string': f'token={token}&last_event_id={higher.id}'.encode(),
+        }
+        body = []
+
+        async def receive():
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            body.append(message.get('body', b''))
+
+        async def scenario():
+            await owner_booking_stream(scope, receive, send)
+            await broadcaster.task
+
+        async_to_sync(scenario)()
+
+        ids = [int(line[len('id: '):]) for line in b''.join(body).decode().splitlines() if line.startswith('id: ')]
+        # The client saw `higher` but never `lower`, which committed after it. Events
+        # of the late-commit window are sent again (delivery is at least once).
+        self.assertEqual(ids, [lower.id, higher.id, newer.id])
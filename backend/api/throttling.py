@@ -0,0 +1,217 @@
+# backend/api/throttling.py
+
+import time
+
+from django.conf import settings
+from django.core.cache.backends.redis import RedisCacheClient
+from rest_framework import exceptions
+from rest_framework.throttling import SimpleRateThrottle
+
+
+# Refills the bucket and takes a token in one step on the Redis server, so
+# concurrent requests on several workers can't all spend the same token
+TAKE_TOKEN_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill_per_second = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or capacity
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * refill_per_second)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return {allowed, tostring(tokens)}
+"""
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    A token-bucket version of DRF's SimpleRateThrottle.
+
+    A rate of '60/min' gives every client a bucket of 60 tokens that refills at
+    one token per second, so short bursts are allowed but the sustained rate is
+    capped.
+
+    With REDIS_URL configured, buckets live in Redis and are updated atomically
+    by a Lua script, so the limit holds across workers and concurrent requests.
+    Other caches get a plain read-modify-write: concurrent requests can spend
+    the same token, and the local-memory cache keeps one bucket per process,
+    so the effective limit is then a multiple of the configured rate.
+    """
+    cache_format = 'throttle_bucket_%(scope)s_%(ident)s'
+    take_token_script = None
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        now = self.timer()
+        refill_per_second = self.num_requests / self.duration
+        # `cache` is a proxy to the default cache, so look at its client instead of its class
+        if isinstance(getattr(self.cache, '_cache', None), RedisCacheClient):
+            allowed, tokens = self.take_token_atomically(now, refill_per_second)
+        else:
+            allowed, tokens = self.take_token(now, refill_per_second)
+
+        if not allowed:
+            self.wait_seconds = (1 - tokens) / refill_per_second
+        return allowed
+
+    def take_token(self, now, refill_per_second):
+        """
+        Returns (allowed, tokens left).
+        """
+        tokens, updated_at = self.cache.get(self.key, (self.num_requests, now))
+
+        # Refill for the time elapsed since the last request, up to capacity
+        tokens = min(self.num_requests, tokens + (now - updated_at) * refill_per_second)
+
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self.cache.set(self.key, (tokens, now), self.duration)
+        return allowed, tokens
+
+    def take_token_atomically(self, now, refill_per_second):
+        key = self.cache.make_and_validate_key(self.key)
+        client = self.cache._cache.get_client(key, write=True)
+        if TokenBucketThrottle.take_token_script is None:
+            # Runs with EVALSHA, loading the script again if Redis restarted
+            TokenBucketThrottle.take_token_script = client.register_script(TAKE_TOKEN_SCRIPT)
+
+        allowed, tokens = TokenBucketThrottle.take_token_script(
+            keys=[key], args=[self.num_requests, refill_per_second, now, self.duration], client=client,
+        )
+        return bool(allowed), float(tokens)
+
+    def wait(self):
+        return getattr(self, 'wait_seconds', None)
+
+
+class AnonTokenBucketThrottle(TokenBucketThrottle):
+    """
+    Limits anonymous users per IP address.
+    """
+    scope = 'anon'
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return None  # Only throttle unauthenticated requests.
+
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': self.get_ident(request),
+        }
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """
+    Limits authenticated users per user id.
+    """
+    scope = 'user'
+
+    def get_cache_key(self, request, view):
+        if not (request.user and request.user.is_authenticated):
+            return None  # Anonymous users are handled by AnonTokenBucketThrottle.
+
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': request.user.pk,
+        }
+
+
+class ScopedTokenBucketThrottle(TokenBucketThrottle):
+    """
+    Applies the rate named by the view's `throttle_scope` attribute, per user
+    when authenticated and per IP otherwise. Views without a scope are not limited.
+    """
+    scope_attr = 'throttle_scope'
+
+    def __init__(self):
+        # Override the usual SimpleRateThrottle, because we can't determine
+        # the rate until called by the view.
+        pass
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, self.scope_attr, None)
+        if not self.scope:
+            return True
+
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = f'user_{request.user.pk}'
+        else:
+            ident = self.get_ident(request)
+
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': ident,
+        }
+
+
+# --- Load shedding ---
+
+class ServiceOverloaded(exceptions.APIException):
+    status_code = 503
+    default_detail = 'The service is temporarily overloaded. Please try again shortly.'
+    default_code = 'overloaded'
+
+    def __init__(self, wait=None, detail=None, code=None):
+        # DRF's exception handler turns `wait` into a Retry-After header
+        self.wait = wait
+        super().__init__(detail, code)
+
+
+class LatencyMonitor:
+    """
+    Tracks an exponentially weighted moving average of request latency for this
+    worker process. Fed by api.middleware.LatencyMonitorMiddleware.
+    """
+    average_ms = 0.0
+    overloaded_until = 0.0
+
+    @classmethod
+    def record(cls, duration_ms):
+        alpha = settings.LOAD_SHEDDING['EWMA_ALPHA']
+        cls.average_ms = alpha * duration_ms + (1 - alpha) * cls.average_ms
+
+        if cls.average_ms > settings.LOAD_SHEDDING['LATENCY_THRESHOLD_MS']:
+            # Stay in overload mode for a cool-down period once the threshold is crossed
+            cls.overloaded_until = time.monotonic() + settings.LOAD_SHEDDING['COOLDOWN_SECONDS']
+
+    @classmethod
+    def is_overloaded(cls):
+        return time.monotonic() < cls.overloaded_until
+
+
+class AnonLoadSheddingThrottle:
+    """
+    Rejects anonymous requests with a 503 while this worker is in overload mode,
+    so authenticated owners and renters keep being served. Add it to cheap,
+    cacheable views (like the public residence list) that can be shed first.
+    """
+
+    def allow_request(self, request, view):
+        if not settings.LOAD_SHEDDING['ENABLED']:
+            return True
+        if request.user and request.user.is_authenticated:
+            return True
+        if LatencyMonitor.is_overloaded():
+            raise ServiceOverloaded(wait=settings.LOAD_SHEDDING['COOLDOWN_SECONDS'])
+        return True
+
+    def wait(self):
+        return None
@@ -9,21 +9,34 @@ from .views import (
     ResidenceViewSet,
     PublicResidenceListView,     
     PublicResidenceDetailView,
+    PublicResidenceQuoteView,
+    PublicResidenceBatchQuoteView,
+    SimilarResidenceListView,
+    PricingRuleViewSet,
     BookingCreateView,
     OwnerBookingListView,
     BookingStatusUpdateView,
+    OwnerBookingHistoryListView,
+    AdminBookingHistoryListView,
+    PrivateDocumentView,
+    BookingAnalyticsView,
+    OwnerSignupAnalyticsView,
 )
 from rest_framework_simplejwt.views import TokenRefreshView
 
 # Create a router and register our viewsets with it.
 router = DefaultRouter()
 router.register(r'residences', ResidenceViewSet, basename='residence')
+router.register(r'pricing-rules', PricingRuleViewSet, basename='pricing-rule')
 
 # The API URLs are now determined automatically by the router.
 urlpatterns = [
     # Public routes for Browse residences
     path('residences/public/', PublicResidenceListView.as_view(), name='public-residence-list'),
     path('residences/public/<int:pk>/', PublicResidenceDetailView.as_view(), name='public-residence-detail'),
+    path('residences/public/<int:pk>/quote/', PublicResidenceQuoteView.as_view(), name='public-residence-quote'),
+    path('residences/public/<int:pk>/similar/', SimilarResidenceListView.as_view(), name='public-residence-similar'),
+    path('residences/public/quotes/', PublicResidenceBatchQuoteView.as_view(), name='public-residence-batch-quote'),
 
     # Authentication routes
     path('register/owner/', UserRegistrationView.as_view(), name='owner-register'),
@@ -34,8 +47,17 @@ urlpatterns = [
     # Add the booking creation route
     path('bookings/create/', BookingCreateView.as_view(), name='booking-create'),
     path('owner/bookings/', OwnerBookingListView.as_view(), name='owner-booking-list'),
+    path('owner/bookings/history/', OwnerBookingHistoryListView.as_view(), name='owner-booking-history'),
+    path('bookings/history/', AdminBookingHistoryListView.as_view(), name='admin-booking-history'),
     path('owner/bookings/<int:pk>/status/', BookingStatusUpdateView.as_view(), name='owner-booking-status-update'),
 
+    # Signed links to private identity documents
+    path('documents/<str:token>/', PrivateDocumentView.as_view(), name='private-document'),
+
+    # Admin analytics, read from the daily rollup tables
+    path('analytics/bookings/', BookingAnalyticsView.as_view(), name='analytics-bookings'),
+    path('analytics/owners/', OwnerSignupAnalyticsView.as_view(), name='analytics-owners'),
+
     # The router URLs
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -1,9 +1,19 @@
 # backend/api/views.py
+from django.core import signing
+from django.db import transaction
+from django.http import Http404
 from rest_framework import generics, permissions, viewsets
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.exceptions import PermissionDenied
+from django.db.models import Exists, OuterRef, Sum
+from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework_simplejwt.views import TokenObtainPairView
 
-from .models import User, Residence, Booking
+from .models import (
+    User, Residence, Booking, ArchivedBooking, PricingRule, PublicResidenceListing,
+    DailyBookingStats, DailyOwnerSignupStats,
+)
 from .serializers import (
     UserRegistrationSerializer,
     CustomTokenObtainPairSerializer,
@@ -13,8 +23,21 @@ from .serializers import (
     BookingSerializer,
     RenterRegistrationSerializer,
     OwnerContactSerializer,
+    PricingRuleSerializer,
+    QuoteRequestSerializer,
+    BatchQuoteRequestSerializer,
+    QuoteSerializer,
+    AnalyticsQuerySerializer,
+    ArchivedBookingSerializer,
+    BookingHistoryQuerySerializer,
 )
 from .permissions import IsActiveOwner
+from .throttling import AnonLoadSheddingThrottle
+from .idempotency import IdempotentCreateMixin
+from .pagination import BookingHistoryPagination
+from . import notifications, outbox, pricing
+from .documents import document_response
+from .storage import get_private_storage, load_document_name
 
 class UserRegistrationView(generics.CreateAPIView):
     """
@@ -31,12 +54,15 @@ class CustomTokenObtainPairView(TokenObtainPairView):
     A custom view for the login endpoint that uses our custom serializer.
     """
     serializer_class = CustomTokenObtainPairSerializer
+    # Password hashing is expensive, so login gets its own strict rate
+    throttle_scope = 'login'
 
 
-class ResidenceViewSet(viewsets.ModelViewSet):
+class ResidenceViewSet(IdempotentCreateMixin, viewsets.ModelViewSet):
     """
     This viewset automatically provides `list`, `create`, `retrieve`,
     `update` and `destroy` actions for Residences.
+    `create` honours the Idempotency-Key header (see api/idempotency.py).
     """
     serializer_class = ResidenceSerializer
     permission_classes = [IsActiveOwner] # Apply our custom permission
@@ -75,9 +101,12 @@ class PublicResidenceListView(generics.ListAPIView):
     """
     permission_classes = [AllowAny]
     serializer_class = PublicResidenceListSerializer
+    throttle_scope = 'public'
+    # Anonymous browsing is the first traffic we drop when the server is overloaded
+    throttle_classes = [AnonLoadSheddingThrottle] + generics.ListAPIView.throttle_classes
 
-    # The queryset ensures we only show available residences from active owners
-    queryset = Residence.objects.filter(is_available=True, owner__ownerprofile__account_status='active')
+    # Listings are only visible for available residences from active owners
+    queryset = PublicResidenceListing.objects.filter(is_visible=True).order_by('residence')
 
 
 class PublicResidenceDetailView(generics.RetrieveAPIView):
@@ -86,23 +115,112 @@ class PublicResidenceDetailView(generics.RetrieveAPIView):
     """
     permission_classes = [AllowAny]
     serializer_class = PublicResidenceDetailSerializer
-    queryset = Residence.objects.filter(is_available=True, owner__ownerprofile__account_status='active')
+    throttle_scope = 'public'
+    queryset = PublicResidenceListing.objects.filter(is_visible=True)
     lookup_field = 'pk' # pk means "primary key", which is the residence ID
 
 
-class BookingCreateView(generics.CreateAPIView):
+class PublicResidenceQuoteView(generics.GenericAPIView):
+    """
+    Returns the price of a stay at a single public residence.
+    Expects `check_in_date` and `check_out_date` query parameters.
+    """
+    permission_classes = [AllowAny]
+    throttle_scope = 'public'
+    queryset = Residence.objects.filter(listing__is_visible=True)
+
+    def get(self, request, *args, **kwargs):
+        params = QuoteRequestSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        residence = self.get_object()
+        quote = pricing.quote(residence, params.validated_data['check_in_date'], params.validated_data['check_out_date'])
+        return Response(QuoteSerializer(quote).data)
+
+
+class PublicResidenceBatchQuoteView(generics.GenericAPIView):
+    """
+    Returns the price of the same stay for many public residences at once,
+    e.g. to show totals next to search results.
+    Expects `ids` (comma separated), `check_in_date` and `check_out_date` query parameters.
+    """
+    permission_classes = [AllowAny]
+    throttle_scope = 'public'
+    queryset = Residence.objects.filter(listing__is_visible=True)
+
+    def get(self, request, *args, **kwargs):
+        params = BatchQuoteRequestSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        residences = self.get_queryset().filter(pk__in=params.validated_data['ids'])
+        quotes = pricing.quote_many(residences, params.validated_data['check_in_date'], params.validated_data['check_out_date'])
+        return Response(QuoteSerializer(quotes, many=True).data)
+
+
+class SimilarResidenceListView(generics.ListAPIView):
+    """
+    Lists residences similar to a public residence, from the precomputed
+    neighbor table. With `check_in_date` and `check_out_date` query parameters,
+    residences already booked for those dates are left out.
+    """
+    permission_classes = [AllowAny]
+    serializer_class = PublicResidenceListSerializer
+    throttle_scope = 'public'
+
+    def get_queryset(self):
+        queryset = (
+            PublicResidenceListing.objects
+            .filter(is_visible=True, residence__neighbor_of__residence_id=self.kwargs['pk'])
+            .exclude(residence_id=self.kwargs['pk'])
+            .order_by('residence__neighbor_of__rank')
+        )
+
+        if 'check_in_date' in self.request.query_params or 'check_out_date' in self.request.query_params:
+            params = QuoteRequestSerializer(data=self.request.query_params)
+            params.is_valid(raise_exception=True)
+            conflicting_bookings = Booking.objects.filter(
+                residence=OuterRef('residence'),
+                status='confirmed',
+                check_in_date__lt=params.validated_data['check_out_date'],
+                check_out_date__gt=params.validated_data['check_in_date'],
+            )
+            queryset = queryset.filter(~Exists(conflicting_bookings))
+
+        return queryset
+
+
+class PricingRuleViewSet(viewsets.ModelViewSet):
+    """
+    Lets active owners manage the pricing rules of their residences.
+    """
+    serializer_class = PricingRuleSerializer
+    permission_classes = [IsActiveOwner]
+
+    def get_queryset(self):
+        return PricingRule.objects.filter(residence__owner=self.request.user)
+
+
+class BookingCreateView(IdempotentCreateMixin, generics.CreateAPIView):
     """
     An endpoint for creating a new booking.
     Only authenticated users can create bookings.
+    Retries sent with the same Idempotency-Key get the original response back.
     """
     serializer_class = BookingSerializer
     permission_classes = [IsAuthenticated] # Ensures only logged-in users can book
+    throttle_scope = 'booking'
 
     def perform_create(self, serializer):
         """
         Assign the currently logged-in user as the guest for the booking.
+        The owner notification is queued in the same transaction and sent later.
         """
-        serializer.save(guest=self.request.user)
+        data = serializer.validated_data
+        # Store the quoted total so dashboards never have to recompute it
+        total = pricing.quote(data['residence'], data['check_in_date'], data['check_out_date'])['total']
+
+        with transaction.atomic():
+            booking = serializer.save(guest=self.request.user, total_price=total)
+            outbox.enqueue_booking_created(booking)
+            notifications.notify_booking_created(booking)
         
 
 class RenterRegistrationView(generics.CreateAPIView):
@@ -125,6 +243,53 @@ class OwnerBookingListView(generics.ListAPIView):
         # Filter bookings to only those for residences owned by the request user
         return Booking.objects.filter(residence__owner=self.request.user).order_by('-created_at')
 
+class BookingHistoryListView(generics.ListAPIView):
+    """
+    Lists archived bookings (see `manage.py archive_bookings`), newest first,
+    one cursor-paginated page at a time.
+    Optional `start` and `end` query parameters filter on the check-in date.
+    Subclasses restrict which bookings are visible.
+    """
+    serializer_class = ArchivedBookingSerializer
+    pagination_class = BookingHistoryPagination
+
+    def get_queryset(self):
+        params = BookingHistoryQuerySerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+
+        queryset = ArchivedBooking.objects.select_related('guest', 'residence__owner').order_by('-created_at', '-id')
+        if 'start' in params.validated_data:
+            queryset = queryset.filter(check_in_date__gte=params.validated_data['start'])
+        if 'end' in params.validated_data:
+            queryset = queryset.filter(check_in_date__lte=params.validated_data['end'])
+        return queryset
+
+
+class OwnerBookingHistoryListView(BookingHistoryListView):
+    """
+    Archived bookings of the currently authenticated owner's residences.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return super().get_queryset().filter(residence__owner=self.request.user)
+
+
+class AdminBookingHistoryListView(BookingHistoryListView):
+    """
+    All archived bookings, for admins. Can be narrowed with `residence` and `guest` ids.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        for field in ('residence', 'guest'):
+            value = self.request.query_params.get(field)
+            if value and value.isdigit():
+                queryset = queryset.filter(**{f'{field}_id': value})
+        return queryset
+
+
 class BookingStatusUpdateView(generics.UpdateAPIView):
     """
     Allows the owner of a residence to update a booking's status (confirm or cancel).
@@ -139,4 +304,83 @@ class BookingStatusUpdateView(generics.UpdateAPIView):
 
     def perform_update(self, serializer):
         # We only allow updating the status field
-        serializer.save(status=self.request.data.get('status'))
\ No newline at end of file
+        with transaction.atomic():
+            booking = serializer.save(status=self.request.data.get('status'))
+            outbox.enqueue_booking_status_changed(booking)
+            notifications.notify_booking_status_changed(booking)
+
+
+class PrivateDocumentView(APIView):
+    """
+    Serves an identity document from a signed, short-lived URL produced by
+    PrivateDocumentStorage.url() (e.g. in the admin). The signature is the credential.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request, token):
+        try:
+            name = load_document_name(token)
+        except signing.BadSignature:
+            raise Http404
+
+        storage = get_private_storage()
+        if not storage.exists(name):
+            raise Http404
+        return document_response(storage, name, request.headers.get('Range'))
+
+
+class BookingAnalyticsView(APIView):
+    """
+    Admin-only booking totals read from the DailyBookingStats rollups.
+    Query parameters: `start`, `end` (dates, default the last 30 days) and
+    `group_by` ('day', 'city' or 'owner').
+    """
+    permission_classes = [IsAdminUser]
+
+    GROUP_FIELDS = {
+        'day': ('date',),
+        'city': ('city',),
+        'owner': ('owner', 'owner__email'),
+    }
+
+    def get(self, request):
+        params = AnalyticsQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        query = params.validated_data
+
+        group_fields = self.GROUP_FIELDS[query['group_by']]
+        rows = (
+            DailyBookingStats.objects
+            .filter(date__gte=query['start'], date__lte=query['end'])
+            .values(*group_fields)
+            .annotate(
+                bookings_created=Sum('bookings_created'),
+                bookings_confirmed=Sum('bookings_confirmed'),
+                bookings_cancelled=Sum('bookings_cancelled'),
+                occupied_nights=Sum('occupied_nights'),
+                gross_booking_value=Sum('gross_booking_value'),
+            )
+            .order_by(*group_fields)
+        )
+        return Response({'start': query['start'], 'end': query['end'], 'results': list(rows)})
+
+
+class OwnerSignupAnalyticsView(APIView):
+    """
+    Admin-only count of new owners per day and account status, read from the
+    DailyOwnerSignupStats rollups. Query parameters: `start` and `end`.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        params = AnalyticsQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        query = params.validated_data
+
+        rows = (
+            DailyOwnerSignupStats.objects
+            .filter(date__gte=query['start'], date__lte=query['end'])
+            .values('date', 'account_status', 'new_owners')
+            .order_by('date', 'account_status')
+        )
+        return Response({'start': query['start'], 'end': query['end'], 'results': list(rows)})
@@ -0,0 +1,83 @@
+# backend/api/warmup.py
+
+import asyncio
+import logging
+import threading
+import time
+
+from django.db import connections
+from django.urls import get_resolver, resolve
+from rest_framework.settings import api_settings
+
+logger = logging.getLogger(__name__)
+
+# Hit on every cold start by the frontend, so these are resolved ahead of time
+WARMUP_PATHS = [
+    '/api/residences/public/',
+    '/api/residences/public/1/',
+    '/api/login/',
+]
+
+
+def warm_up():
+    """
+    Does the one-off work of the first request before the worker accepts traffic:
+    opens the database connections, builds the URL resolver (which imports every
+    view and serializer) and loads the DRF default classes.
+
+    Called from core/wsgi.py and core/asgi.py. Connections are per process, so
+    don't combine this with gunicorn's --preload.
+    """
+    try:
+        in_event_loop = asyncio.get_running_loop() is not None
+    except RuntimeError:
+        in_event_loop = False
+
+    if not in_event_loop:
+        prime()
+    else:
+        # ASGI servers may import the application inside their event loop, where
+        # Django forbids database access. Warm up from a thread instead; its DB
+        # connection can't be reused by requests, so close it afterwards.
+        thread = threading.Thread(target=prime_in_thread)
+        thread.start()
+        thread.join()
+
+
+def prime_in_thread():
+    try:
+        prime()
+    finally:
+        connections.close_all()
+
+
+def prime():
+    """
+    Runs every warm-up step, best effort: a step that fails (e.g. the database
+    is still waking up) is logged and left to the first request that needs it,
+    instead of keeping the worker from booting.
+    """
+    started = time.monotonic()
+
+    for connection in connections.all():
+        run_step(f"connect:{connection.alias}", connection.ensure_connection)
+
+    run_step("resolver", get_resolver)
+    for path in WARMUP_PATHS:
+        run_step(f"resolve:{path}", resolve, path)
+
+    # These settings import their classes on first access
+    for setting in (
+        'DEFAULT_AUTHENTICATION_CLASSES', 'DEFAULT_PERMISSION_CLASSES', 'DEFAULT_THROTTLE_CLASSES',
+        'DEFAULT_RENDERER_CLASSES', 'DEFAULT_PARSER_CLASSES',
+    ):
+        run_step(f"settings:{setting}", getattr, api_settings, setting)
+
+    logger.info("startup.warmup duration_ms=%d", (time.monotonic() - started) * 1000)
+
+
+def run_step(name, func, *args):
+    try:
+        func(*args)
+    except Exception:
+        logger.warning("startup.warmup_step_failed step=%s", name, exc_info=True)
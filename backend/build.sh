@@ -13,4 +13,7 @@ python manage.py collectstatic --no-input
 python manage.py migrate contenttypes
 python manage.py migrate auth
 python manage.py migrate api
-python manage.py migrate
\ No newline at end of file
+python manage.py migrate
+
+# Repair any drift in the denormalized public listings
+python manage.py rebuild_public_listings
\ No newline at end of file
@@ -14,3 +14,12 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 application = get_asgi_application()
+
+# Live owner booking updates (server-sent events) bypass Django's request cycle
+from api.streams import with_booking_stream
+application = with_booking_stream(application)
+
+# Prime DB connections and URL resolution before the first request arrives
+if os.environ.get('WARMUP_ON_START', 'True') == 'True':
+    from api.warmup import warm_up
+    warm_up()
@@ -1,6 +1,7 @@
 import os
 import dj_database_url
 from pathlib import Path
+from corsheaders.defaults import default_headers
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -27,8 +28,9 @@ INSTALLED_APPS = [
     # 3rd party apps first
     'corsheaders',
     'rest_framework',
+    # Only cloudinary_storage is installed (for its management commands); the
+    # `cloudinary` app adds nothing we use and would import the SDK at start-up
     'cloudinary_storage',
-    'cloudinary',
 
     # Django's built-in apps that must come before your custom user app
     'django.contrib.auth',
@@ -46,6 +48,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Times every request for load shedding, so it sits at the top of the stack
+    'api.middleware.LatencyMonitorMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     # Add CORS middleware here
@@ -122,7 +126,6 @@ USE_TZ = True
 # Static files (CSS, JavaScript, Images)
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles' # Tell Django where to collect all static files
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 # Cloudinary configuration for Media files
 CLOUDINARY_STORAGE = {
@@ -130,7 +133,26 @@ CLOUDINARY_STORAGE = {
     'API_KEY': os.environ.get('CLOUDINARY_API_KEY'),
     'API_SECRET': os.environ.get('CLOUDINARY_API_SECRET'),
 }
-DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
+
+# default_storage is a lazy object, so the Cloudinary SDK is only imported and
+# configured on first media access. Without credentials (local development)
+# media files are stored in MEDIA_ROOT.
+STORAGES = {
+    'default': {
+        'BACKEND': (
+            'cloudinary_storage.storage.MediaCloudinaryStorage'
+            if CLOUDINARY_STORAGE['CLOUD_NAME']
+            else 'django.core.files.storage.FileSystemStorage'
+        ),
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+    # Identity documents (api.storage.PrivateDocumentStorage)
+    'private': {
+        'BACKEND': 'api.storage.PrivateDocumentStorage',
+    },
+}
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -143,6 +165,8 @@ CORS_ALLOWED_ORIGINS = [
     "http://127.0.0.1:5173",
 ]
 CORS_ALLOW_ALL_ORIGINS = False
+# Lets browser clients send retry-safe POSTs (see api/idempotency.py)
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
 
 VERCEL_APP_URL = os.environ.get('VERCEL_APP_URL')
 if VERCEL_APP_URL:
@@ -158,7 +182,42 @@ REST_FRAMEWORK = {
     # We will specify public endpoints (like registration) individually.
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
-    ]
+    ],
+    # Token-bucket throttles (see api/throttling.py). Views pick a scoped rate
+    # with their `throttle_scope` attribute on top of the per-IP/per-user limits.
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.AnonTokenBucketThrottle',
+        'api.throttling.UserTokenBucketThrottle',
+        'api.throttling.ScopedTokenBucketThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'anon': os.environ.get('THROTTLE_RATE_ANON', '120/min'),
+        'user': os.environ.get('THROTTLE_RATE_USER', '300/min'),
+        'public': os.environ.get('THROTTLE_RATE_PUBLIC', '60/min'),
+        'login': os.environ.get('THROTTLE_RATE_LOGIN', '10/min'),
+        'booking': os.environ.get('THROTTLE_RATE_BOOKING', '20/hour'),
+    },
+    # Behind Render's proxy the client IP has to be read from X-Forwarded-For
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', '1')) if RENDER_EXTERNAL_HOSTNAME else None,
+}
+
+# Throttle buckets must live in a cache shared by all workers to be accurate
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+
+# Anonymous list traffic is shed (503 + Retry-After) while the average request
+# latency of a worker is above the threshold
+LOAD_SHEDDING = {
+    'ENABLED': os.environ.get('LOAD_SHEDDING_ENABLED', 'True') == 'True',
+    'LATENCY_THRESHOLD_MS': int(os.environ.get('LOAD_SHEDDING_LATENCY_MS', '1500')),
+    'EWMA_ALPHA': 0.1,
+    'COOLDOWN_SECONDS': 10,
 }
 
 # backend/core/settings.py (at the very bottom)
@@ -167,4 +226,58 @@ AUTH_USER_MODEL = 'api.User'
 
 # backend/core/settings.py (at the bottom)
 MEDIA_URL = '/media/'
-MEDIA_ROOT = BASE_DIR / 'media'
\ No newline at end of file
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Pending bookings older than this are cancelled by `manage.py expire_pending_bookings`
+BOOKING_PENDING_EXPIRY_HOURS = int(os.environ.get('BOOKING_PENDING_EXPIRY_HOURS', '48'))
+BOOKING_EXPIRY_BATCH_SIZE = int(os.environ.get('BOOKING_EXPIRY_BATCH_SIZE', '500'))
+
+# Bookings that ended (or were cancelled) more than this many days ago are moved
+# to ArchivedBooking by `manage.py archive_bookings`
+BOOKING_ARCHIVE_AFTER_DAYS = int(os.environ.get('BOOKING_ARCHIVE_AFTER_DAYS', '180'))
+BOOKING_ARCHIVE_BATCH_SIZE = int(os.environ.get('BOOKING_ARCHIVE_BATCH_SIZE', '500'))
+
+# Transactional outbox (see api/outbox.py and `manage.py dispatch_outbox`)
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'ResiRent <no-reply@resirent.app>')
+if DEBUG:
+    EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+OUTBOX_WEBHOOK_URLS = [url for url in os.environ.get('OUTBOX_WEBHOOK_URLS', '').split(',') if url]
+OUTBOX_WEBHOOK_TIMEOUT = 5
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_MAX_ATTEMPTS = 8
+OUTBOX_BASE_BACKOFF_SECONDS = 30
+OUTBOX_MAX_BACKOFF_SECONDS = 6 * 60 * 60
+OUTBOX_LEASE_SECONDS = 5 * 60
+
+# Private identity documents: stored outside MEDIA_ROOT and only reachable
+# through signed links that expire after PRIVATE_DOCUMENT_URL_MAX_AGE seconds.
+PRIVATE_MEDIA_ROOT = os.environ.get('PRIVATE_MEDIA_ROOT', str(BASE_DIR / 'private_media'))
+PRIVATE_DOCUMENT_URL_MAX_AGE = 5 * 60
+# 'x-accel-redirect' (nginx) or 'x-sendfile' (Apache) hands the file transfer
+# to the front proxy; leave empty to let Django stream files (development only)
+PRIVATE_MEDIA_SENDFILE = os.environ.get('PRIVATE_MEDIA_SENDFILE', '')
+# nginx `internal` location that maps to PRIVATE_MEDIA_ROOT
+PRIVATE_MEDIA_INTERNAL_URL = os.environ.get('PRIVATE_MEDIA_INTERNAL_URL', '/protected/')
+
+# Idempotency-Key support on create endpoints (api/idempotency.py). Stored
+# responses are replayed for TTL_HOURS; `manage.py purge_idempotency_keys` deletes them after that.
+IDEMPOTENCY = {
+    'TTL_HOURS': int(os.environ.get('IDEMPOTENCY_KEY_TTL_HOURS', '24')),
+    'WAIT_TIMEOUT': 10,      # seconds a duplicate waits for the in-flight request
+    'POLL_INTERVAL': 0.1,    # seconds between checks while waiting
+    'LOCK_TIMEOUT': 60,      # an in-flight request older than this is presumed dead
+}
+
+# Server-sent events stream of owner booking updates (api/streams.py), served
+# when running core.asgi:application, e.g. with uvicorn
+BOOKING_STREAM = {
+    'POLL_INTERVAL': 1.0,        # seconds between database polls per process
+    'HEARTBEAT_INTERVAL': 15,    # seconds between keep-alive comments
+    'RETRY_MS': 3000,            # client reconnect delay
+    'QUEUE_SIZE': 1000,          # events buffered per connection
+    # Rows committed up to this many seconds after they were created are still
+    # streamed, even if rows with higher ids were streamed first
+    'LATE_COMMIT_WINDOW': 30,
+    # Reconnecting clients only need recent events; `manage.py purge_booking_notifications` deletes older ones
+    'RETENTION_HOURS': int(os.environ.get('BOOKING_STREAM_RETENTION_HOURS', '24')),
+}
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 application = get_wsgi_application()
+
+# Prime DB connections and URL resolution before the first request arrives
+if os.environ.get('WARMUP_ON_START', 'True') == 'True':
+    from api.warmup import warm_up
+    warm_up()
@@ -171,7 +171,7 @@ const OwnerDashboardPage = () => {
                     </div>
                     <div className="text-sm text-gray-600 mt-2 sm:mt-0 sm:text-right">
                       <p><strong>Dates:</strong> {booking.check_in_date} to {booking.check_out_date}</p>
-                      <p><strong>A payer:</strong>{booking.price_per_night} FCFA</p>
+                      <p><strong>A payer:</strong>{booking.total_price ?? booking.price_per_night} FCFA</p>
                     </div>
                   </div>
                   <div className="mt-4 pt-4 border-t flex flex-col sm:flex-row justify-between items-start sm:items-center">